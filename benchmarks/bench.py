@@ -0,0 +1,242 @@
+"""Scaling benchmark of the fetch, compute and render phases on synthetic universes.
+
+    python -m benchmarks.bench run --sizes 300 3000 30000 --label baseline
+    python -m benchmarks.bench compare benchmarks/results/baseline.json benchmarks/results/new.json
+
+Every size gets a synthetic LIST_1 of that many tickers (LIST_2 and LIST_3 keep
+their real sizes) served by an in-memory ReplayProvider, so no network is used.
+For each table:
+
+- "fetch" is a cold compute (provider calls + computation) minus "compute";
+- "compute" is the same call again on the service, served from its frames;
+- "render" fills and saves the template with python-docx and compiled XML.
+
+Timings are the best of --repeat runs. Peak memory comes from a separate
+tracemalloc pass so that tracing does not distort the timings.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from services.market_data_service import MarketDataService
+from services.market_data_provider import ReplayProvider, synthetic_frame
+from services.fetch_engine import FetchEngine
+from services.word_service import WordService
+from services.compiled_template import load_compiled_template
+from data.universe import LIST_2, LIST_3
+
+TEMPLATE_PATH = "templates/closing_template.docx"
+RESULTS_DIR = "benchmarks/results"
+DEFAULT_SIZES = [300, 3000, 30000]
+
+# Longest daily lookback requested by the tables (table 3 reads 60 sessions)
+DAILY_BARS = 60
+END_DATE = "2026-01-30"
+
+
+class CountingProvider(ReplayProvider):
+    """ReplayProvider counting calls, tickers requested and bars served"""
+
+    def __init__(self, frames, latency=0.0):
+        super().__init__(frames=frames, latency=latency)
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.tickers = 0
+        self.bars = 0
+
+    def download(self, tickers, period, interval, start=None):
+        frames = super().download(tickers, period, interval, start)
+        self.calls += 1
+        self.tickers += len(tickers)
+        self.bars += sum(len(frame) for frame in frames.values())
+        return frames
+
+
+def synthetic_universe(size):
+    return [{"Ticker": f"SYN{i:05d}.PA", "Name": f"Synthetic {i}"} for i in range(size)]
+
+
+def synthetic_frames(universe, volume_source):
+    frames = {}
+    for item in universe + LIST_2 + LIST_3:
+        ticker = item["Ticker"]
+        frames[(ticker, "1d")] = synthetic_frame(ticker, "1d", DAILY_BARS, END_DATE)
+        if volume_source != "daily":
+            bars = 510 // int(volume_source[:-1])
+            frames[(ticker, volume_source)] = synthetic_frame(ticker, volume_source, bars, END_DATE)
+    return frames
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def _peak(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_tables(provider, lists, args):
+    """Fetch and compute timings for tables 1-3, plus the results for rendering"""
+    computations = {
+        "table_1": lambda service: service.compute_table_1(lists[0]),
+        "table_2": lambda service: service.compute_table_2(lists[1]),
+        "table_3": lambda service: service.compute_table_3(lists[2])
+    }
+
+    phases, tables = {}, {}
+    for name, compute in computations.items():
+        best_cold, best_warm = float("inf"), float("inf")
+        for _ in range(args.repeat):
+            provider.reset()
+            service = MarketDataService(provider, engine=FetchEngine(workers=args.workers, rate=0),
+                                        volume_source=args.volume_source)
+            cold, tables[name] = _timed(lambda: compute(service))
+            warm, _ = _timed(lambda: compute(service))
+            best_cold, best_warm = min(best_cold, cold), min(best_warm, warm)
+
+        def cold_run():
+            compute(MarketDataService(provider, engine=FetchEngine(workers=args.workers, rate=0),
+                                      volume_source=args.volume_source))
+
+        phases[f"{name}.fetch"] = {
+            "seconds": best_cold - best_warm,
+            "calls": provider.calls,
+            "tickers_requested": provider.tickers,
+            "bars": provider.bars
+        }
+        phases[f"{name}.compute"] = {"seconds": best_warm}
+        phases[f"{name}.fetch"]["peak_bytes"] = _peak(cold_run)
+
+    return phases, (tables["table_1"], tables["table_2"], tables["table_3"])
+
+
+def bench_render(tables, args):
+    phases = {}
+    renderers = {
+        "render.docx": lambda: WordService(TEMPLATE_PATH),
+        "render.compiled": lambda: load_compiled_template(TEMPLATE_PATH).new_document()
+    }
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "report.docx")
+
+        for name, open_document in renderers.items():
+            def render():
+                document = open_document()
+                document.replace_date("January 30th, 2026")
+                document.fill_table_1(tables[0])
+                document.fill_table_2(tables[1])
+                document.fill_table_3(tables[2])
+                document.save(path)
+
+            render()  # compile / import warm-up
+            seconds = min(_timed(render)[0] for _ in range(args.repeat))
+            phases[name] = {"seconds": seconds, "peak_bytes": _peak(render)}
+
+    return phases
+
+
+def run(args):
+    results = {}
+    for size in args.sizes:
+        universe = synthetic_universe(size)
+        setup, frames = _timed(lambda: synthetic_frames(universe, args.volume_source))
+        provider = CountingProvider(frames, latency=args.latency)
+
+        phases, tables = bench_tables(provider, (universe, LIST_2, LIST_3), args)
+        phases.update(bench_render(tables, args))
+        results[str(size)] = phases
+
+        total = sum(phase["seconds"] for phase in phases.values())
+        print(f"{size:>7} tickers: {total:8.3f}s (synthetic data built in {setup:.1f}s)")
+        for name, phase in phases.items():
+            extra = f"  {phase['calls']} calls" if "calls" in phase else ""
+            peak = f"  peak {phase['peak_bytes'] / 2**20:8.1f} MiB" if "peak_bytes" in phase else ""
+            print(f"    {name:<18}{phase['seconds']:9.4f}s{peak}{extra}")
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+
+    report = {
+        "label": args.label,
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {
+            "repeat": args.repeat,
+            "workers": args.workers,
+            "latency": args.latency,
+            "volume_source": args.volume_source
+        },
+        "results": results
+    }
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {args.output}")
+
+
+def compare(args):
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"{before['label']} ({before['commit']}) -> {after['label']} ({after['commit']})")
+    for size, phases in after["results"].items():
+        if size not in before["results"]:
+            continue
+        print(f"\n{size} tickers")
+        for name, phase in phases.items():
+            old = before["results"][size].get(name)
+            if old is None:
+                continue
+            ratio = phase["seconds"] / old["seconds"] if old["seconds"] > 0 else float("inf")
+            print(f"    {name:<18}{old['seconds']:9.4f}s -> {phase['seconds']:9.4f}s  x{ratio:6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="benchmark every phase and save the results")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--workers", type=int, default=8)
+    run_parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per provider call")
+    run_parser.add_argument("--volume-source", default="daily")
+    run_parser.add_argument("--label", default=datetime.now().strftime("%Y%m%d-%H%M%S"))
+    run_parser.add_argument("--output", help=f"results file (default: {RESULTS_DIR}/<label>.json)")
+
+    compare_parser = commands.add_parser("compare", help="compare two saved result files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        args.output = args.output or os.path.join(RESULTS_DIR, f"{args.label}.json")
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
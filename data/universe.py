@@ -1,306 +1,16 @@
-LIST_1 = [
-    {"Ticker": "74SW.PA", "Name": "74Software"},
-    {"Ticker": "AB.PA", "Name": "AB Science"},
-    {"Ticker": "ABCA.PA", "Name": "ABC Arbitrage"},
-    {"Ticker": "ABNX.PA", "Name": "ABIONYX Pharma"},
-    {"Ticker": "ABT.MI", "Name": "Abitare In"},
-    {"Ticker": "ABVX.PA", "Name": "Abivax"},
-    {"Ticker": "ADOC.PA", "Name": "Adocia"},
-    {"Ticker": "AF.PA", "Name": "Air France-KLM"},
-    {"Ticker": "AFME.PA", "Name": "Affluent Medical SA"},
-    {"Ticker": "AGP.MI", "Name": "Altea"},
-    {"Ticker": "AKW.PA", "Name": "Akwel"},
-    {"Ticker": "ALAMA.PA", "Name": "AMA"},
-    {"Ticker": "ALATI.PA", "Name": "ACTIA"},
-    {"Ticker": "ALBFR.PA", "Name": "Sidetrade SA"},
-    {"Ticker": "ALBIZ.PA", "Name": "Obiz"},  
-    {"Ticker": "ALBPK.PA", "Name": "Broadpeak"},
-    {"Ticker": "ALCAT.PA", "Name": "Catana Group"},
-    {"Ticker": "ALCUR.PA", "Name": "Arcure"},
-    {"Ticker": "ALDLT.PA", "Name": "Delta Plus"},
-    {"Ticker": "ALDVI.PA", "Name": "Advicienne"},
-    {"Ticker": "ALERS.PA", "Name": "Eurobio Scientific"},
-    {"Ticker": "ALESE.PA", "Name": "Entech"},
-    {"Ticker": "ALFRE.PA", "Name": "Freelance.com"},
-    {"Ticker": "ALFUM.PA", "Name": "Fill Up Media"},
-    {"Ticker": "ALGAE.PA", "Name": "Fermentalg"},
-    {"Ticker": "ALGBE.PA", "Name": "Global Bioenergies"},
-    {"Ticker": "ALGIL.PA", "Name": "Groupe Guillin"},
-    {"Ticker": "ALHEX.PA", "Name": "Hexaom"},
-    {"Ticker": "ALHRS.PA", "Name": "Hydrogen RS"},
-    {"Ticker": "ALHYP.PA", "Name": "Hipay Group"},
-    {"Ticker": "ALICA.PA", "Name": "ICAPE Holding"},
-    {"Ticker": "ALINV.PA", "Name": "Invibes Advertising"},
-    {"Ticker": "ALKLK.PA", "Name": "Kerlink"},
-    {"Ticker": "ALLEC.PA", "Name": "Cogelec"},
-    {"Ticker": "ALLGO.PA", "Name": "Largo"},
-    {"Ticker": "ALLIX.PA", "Name": "Wallix Group"},
-    {"Ticker": "ALLPL.PA", "Name": "Lepermislibre"},
-    {"Ticker": "ALMCE.PA", "Name": "Mon Courtier Energie"},
-    {"Ticker": "ALMDT.PA", "Name": "Median Technologies"},
-    {"Ticker": "ALMIB.PA", "Name": "Amoéba"},
-    {"Ticker": "ALMRB.PA", "Name": "Mr Bricolage"},
-    {"Ticker": "ALNN6.PA", "Name": "Enesys Technologies"},
-    {"Ticker": "ALODC.PA", "Name": "Omer Decugies & Cie"},
-    {"Ticker": "ALOKW.PA", "Name": "Groupe Okwind"},
-    {"Ticker": "ALOPM.PA", "Name": "Oncodesign PM"},
-    {"Ticker": "ALPOU.PA", "Name": "Poulaillon"},
-    {"Ticker": "ALPUL.PA", "Name": "Pullup Entertainement"},
-    {"Ticker": "ALRIB.PA", "Name": "Riber"},
-    {"Ticker": "ALSEM.PA", "Name": "Semco Technologies"},
-    {"Ticker": "ALSMA.PA", "Name": "SMAIO"},
-    {"Ticker": "ALSPT.PA", "Name": "Spartoo"},
-    {"Ticker": "ALSTW.PA", "Name": "Streamwide"},
-    {"Ticker": "ALTA.PA", "Name": "Altarea"},
-    {"Ticker": "ALU10.PA", "Name": "U10"},
-    {"Ticker": "ALVAL.PA", "Name": "Valbiotis"},
-    {"Ticker": "ALVAP.PA", "Name": "Kumulus Vape"},
-    {"Ticker": "ALVDM.PA", "Name": "Voyageurs du Monde"},
-    {"Ticker": "ALVU.PA", "Name": "Vente-Unique.com"},
-    {"Ticker": "APAM.AS", "Name": "APERAM"},
-    {"Ticker": "ARG.PA", "Name": "ARGAN"},
-    {"Ticker": "ARVEN.PA", "Name": "Arverne"},
-    {"Ticker": "ASY.PA", "Name": "Assystem"},
-    {"Ticker": "ATE.PA", "Name": "Alten"},
-    {"Ticker": "ATEME.PA", "Name": "Ateme"},
-    {"Ticker": "ATO.PA", "Name": "Atos"},
-    {"Ticker": "AUB.PA", "Name": "Aubay"},
-    {"Ticker": "AVT.PA", "Name": "Avenir Telecom"},
-    {"Ticker": "AYV.PA", "Name": "Ayvens"},
-    {"Ticker": "BALYO.PA", "Name": "Balyo"},
-    {"Ticker": "BB.PA", "Name": "Societe BIC"},
-    {"Ticker": "BEN.PA", "Name": "Beneteau"},
-    {"Ticker": "BIG.PA", "Name": "Bigben Interactive"},
-    {"Ticker": "BIM.PA", "Name": "Biomérieux"},
-    {"Ticker": "BLC.PA", "Name": "Bastide le Confort Med."},
-    {"Ticker": "BOL.PA", "Name": "Bolloré"},
-    {"Ticker": "BON.PA", "Name": "Bonduelle"},
-    {"Ticker": "BSD.PA", "Name": "Bourse Direct"},
-    {"Ticker": "CARM.PA", "Name": "Carmila"},
-    {"Ticker": "CDA.PA", "Name": "Compagnie des Alpes"},
-    {"Ticker": "CDG.MI", "Name": "Casta Diva"},
-    {"Ticker": "CEN.PA", "Name": "Groupe CRIT"},
-    {"Ticker": "CFL.MI", "Name": "Cofle"},
-    {"Ticker": "CLA.PA", "Name": "Claranova"},
-    {"Ticker": "CLARI.PA", "Name": "Clariane"},
-    {"Ticker": "CO.PA", "Name": "Casino Guichard-Perrachon"},
-    {"Ticker": "COFA.PA", "Name": "Coface"},
-    {"Ticker": "COH.PA", "Name": "Coheris"},
-    {"Ticker": "COV.PA", "Name": "Covivio"},
-    {"Ticker": "CRI.PA", "Name": "Compagnie Chargeurs Invest"},
-    {"Ticker": "DBG.PA", "Name": "Derichebourg"},
-    {"Ticker": "DBV.PA", "Name": "DBV Technologies"},
-    {"Ticker": "DEC.PA", "Name": "JCDecaux"},
-    {"Ticker": "DHH.MI", "Name": "DHH"},
-    {"Ticker": "DIB.MI", "Name": "Digital Bros"},
-    {"Ticker": "DKUPL.PA", "Name": "ADLPartner"},
-    {"Ticker": "DOX.MI", "Name": "Doxee"},
-    {"Ticker": "EAPI.PA", "Name": "Euroapi"},
-    {"Ticker": "EDAC.MI", "Name": "EdiliziAcrobatica"},
-    {"Ticker": "EKI.PA", "Name": "Ekinops"},
-    {"Ticker": "ELIOR.PA", "Name": "Elior Group"},
-    {"Ticker": "ELIS.PA", "Name": "Elis"},
-    {"Ticker": "EMEIS.PA", "Name": "Emeis"},
-    {"Ticker": "EOS.PA", "Name": "Acteos"},
-    {"Ticker": "EQS.PA", "Name": "Equasens"},
-    {"Ticker": "ERA.PA", "Name": "Eramet"},
-    {"Ticker": "ES.PA", "Name": "Esso"},
-    {"Ticker": "ETL.PA", "Name": "Eutelsat"},
-    {"Ticker": "EVISO.MI", "Name": "Eviso"},
-    {"Ticker": "EVS.BR", "Name": "EVS Broadcast Equipment"},
-    {"Ticker": "EXA.PA", "Name": "Exail Technologies"},
-    {"Ticker": "EXAI.MI", "Name": "Expert.ai"},
-    {"Ticker": "EXENS.PA", "Name": "Exosens"},
-    {"Ticker": "EXPL.PA", "Name": "SA D'Explosifs & PC"},
-    {"Ticker": "FDE.PA", "Name": "La Française de l’Énergie SA"},
-    {"Ticker": "FDJU.PA", "Name": "FDJ United"},
-    {"Ticker": "FGA.PA", "Name": "Figeac-Aero"},
-    {"Ticker": "FII.PA", "Name": "LISI"},
-    {"Ticker": "FNAC.PA", "Name": "Fnac Darty"},
-    {"Ticker": "FORSE.PA", "Name": "Forsee Power"},
-    {"Ticker": "FR.PA", "Name": "Valeo"},
-    {"Ticker": "FRVIA.PA", "Name": "Forvia"},
-    {"Ticker": "FUM.MI", "Name": "Franchi Umberto Marmi"},
-    {"Ticker": "GBT.PA", "Name": "Guerbet"},
-    {"Ticker": "GLO.PA", "Name": "GL Events"},
-    {"Ticker": "GM.MI", "Name": "Gentili Mosconi"},
-    {"Ticker": "GNFT.PA", "Name": "Genfit"},
-    {"Ticker": "GPE.PA", "Name": "GPE Groupe Pizzorno"},
-    {"Ticker": "GPI.MI", "Name": "GPI"},
-    {"Ticker": "GUI.PA", "Name": "Guillemot"},
-    {"Ticker": "HCO.PA", "Name": "HighCo"},
-    {"Ticker": "HDF.PA", "Name": "Hydrogène de France"},
-    {"Ticker": "ICAD.PA", "Name": "Icade"},
-    {"Ticker": "IDL.PA", "Name": "Id Logistics Group"},
-    {"Ticker": "IEG.MI", "Name": "Italian Exhibition Group"},
-    {"Ticker": "ILP.MI", "Name": "ILPRA"},
-    {"Ticker": "INF.PA", "Name": "Infotel S"},
-    {"Ticker": "IPH.PA", "Name": "Innate Pharma"},
-    {"Ticker": "IPN.PA", "Name": "Ipsen"},
-    {"Ticker": "IPS.PA", "Name": "Ipsos"},
-    {"Ticker": "ITD.MI", "Name": "Intred"},
-    {"Ticker": "ITP.PA", "Name": "Interparfums"},
-    {"Ticker": "IVA.PA", "Name": "Inventiva"},
-    {"Ticker": "IWB.MI", "Name": "Italian Wine Brands"},
-    {"Ticker": "JCQ.PA", "Name": "Jacquet Metals"},
-    {"Ticker": "KMR.L", "Name": "Kenmare Resources"},
-    {"Ticker": "KOF.PA", "Name": "Kaufman & Broad"},
-    {"Ticker": "LACR.PA", "Name": "LACROIX Group"},
-    {"Ticker": "LAT.PA", "Name": "Latécoère"},
-    {"Ticker": "LBIRD.PA", "Name": "Lumibird"},
-    {"Ticker": "LHYFE.PA", "Name": "Lhyfe"},
-    {"Ticker": "LOCAL.PA", "Name": "Solocal Group"},
-    {"Ticker": "LOUP.PA", "Name": "Societe LDC SADIR"},
-    {"Ticker": "LSS.PA", "Name": "Lectra"},
-    {"Ticker": "MAPS.MI", "Name": "Maps"},
-    {"Ticker": "MAU.PA", "Name": "Etablissements M&P"},
-    {"Ticker": "MDM.PA", "Name": "Maisons du Monde"},
-    {"Ticker": "MEDCL.PA", "Name": "MedinCell"},
-    {"Ticker": "MEMS.PA", "Name": "MEMSCAP"},
-    {"Ticker": "MERY.PA", "Name": "Mercialys"},
-    {"Ticker": "MF.PA", "Name": "Wendel"},
-    {"Ticker": "MHM.PA", "Name": "MyHotelMatch"},
-    {"Ticker": "MMT.PA", "Name": "Métropole Télévision"},
-    {"Ticker": "MRN.PA", "Name": "Mersen"},
-    {"Ticker": "MS.MI", "Name": "Misitano & Stracuzzi"},
-    {"Ticker": "MTU.PA", "Name": "Manitou"},
-    {"Ticker": "NACON.PA", "Name": "Nacon"},
-    {"Ticker": "NANO.PA", "Name": "Nanobiotix"},
-    {"Ticker": "NDT.MI", "Name": "Neodecortech"},
-    {"Ticker": "NK.PA", "Name": "Eimerys"},
-    {"Ticker": "NOVA.MI", "Name": "Novamarine"},
-    {"Ticker": "NRO.PA", "Name": "Neurones"},
-    {"Ticker": "NXI.PA", "Name": "Nexity"},
-    {"Ticker": "OIZ.IR", "Name": "Origin Enterprises"},
-    {"Ticker": "OMER.MI", "Name": "Omer"},
-    {"Ticker": "OPM.PA", "Name": "OpMobility"},
-    {"Ticker": "OREGE.PA", "Name": "Orege"},
-    {"Ticker": "OSA.MI", "Name": "Osai Automation System"},
-    {"Ticker": "OSE.PA", "Name": "OSE Immuno"},
-    {"Ticker": "OVH.PA", "Name": "OVH Groupe"},
-    {"Ticker": "PARRO.PA", "Name": "Parrot"},
-    {"Ticker": "PEUG.PA", "Name": "Peugeot Invest"},
-    {"Ticker": "PHN.MI", "Name": "Pharmanutra"},
-    {"Ticker": "PIG.PA", "Name": "Haulotte Group"},
-    {"Ticker": "PLNW.PA", "Name": "Planisware"},
-    {"Ticker": "PLX.PA", "Name": "Pluxee"},
-    {"Ticker": "POR.MI", "Name": "Portobello"},
-    {"Ticker": "POXEL.PA", "Name": "Poxel"},
-    {"Ticker": "PRC.PA", "Name": "Artmarket.com"},
-    {"Ticker": "PRT.MI", "Name": "Esprinet"},
-    {"Ticker": "PVL.PA", "Name": "Plastique Du VdL"},
-    {"Ticker": "QDT.PA", "Name": "Quadient"},
-    {"Ticker": "RBO.PA", "Name": "Roche Bobois"},
-    {"Ticker": "RBT.PA", "Name": "Robertet"},
-    {"Ticker": "RCO.PA", "Name": "Rémy Cointreau"},
-    {"Ticker": "RFG.MI", "Name": "Racing Force"},
-    {"Ticker": "RUI.PA", "Name": "Rubis"},
-    {"Ticker": "S30.PA", "Name": "Solutions 30"},
-    {"Ticker": "SBT.PA", "Name": "Oeneo"},
-    {"Ticker": "SCHP.PA", "Name": "Seche Environnement"},
-    {"Ticker": "SCST.ST", "Name": "Scandi Standard AB"},
-    {"Ticker": "SDG.PA", "Name": "Synergie"},
-    {"Ticker": "SEFER.PA", "Name": "Serge Ferrari"},
-    {"Ticker": "SEIF.MI", "Name": "SE Il Fatto"},
-    {"Ticker": "SESG.PA", "Name": "SES"},
-    {"Ticker": "SIGHT.PA", "Name": "GenSight Biologics"},
-    {"Ticker": "SK.PA", "Name": "SEB"},
-    {"Ticker": "SMCP.PA", "Name": "SMCP"},
-    {"Ticker": "SOI.PA", "Name": "SOITEC"},
-    {"Ticker": "SOLB.BR", "Name": "Solvay"},
-    {"Ticker": "SOM.MI", "Name": "Somec"},
-    {"Ticker": "SOP.PA", "Name": "Sopra Steria Group"},
-    {"Ticker": "STAR7.MI", "Name": "Star7"},
-    {"Ticker": "STF.PA", "Name": "STEF"},
-    {"Ticker": "SVS.MI", "Name": "Svas Biosana"},
-    {"Ticker": "SWP.PA", "Name": "Sword Group"},
-    {"Ticker": "TE.PA", "Name": "Technip Energies"},
-    {"Ticker": "TEP.PA", "Name": "Teleperformance"},
-    {"Ticker": "TFF.PA", "Name": "TFF Group"},
-    {"Ticker": "TFI.PA", "Name": "TF1 Group"},
-    {"Ticker": "TISG.MI", "Name": "The Italian Sea Group"},
-    {"Ticker": "TRI.PA", "Name": "Trigano"},
-    {"Ticker": "UBI.PA", "Name": "Ubisoft Entertainment"},
-    {"Ticker": "UPR.IR", "Name": "Uniphar"},
-    {"Ticker": "VAC.PA", "Name": "Pierre et Vacances"},
-    {"Ticker": "VANTI.PA", "Name": "Vantiva"},
-    {"Ticker": "VCT.PA", "Name": "Vicat"},
-    {"Ticker": "VETO.PA", "Name": "Vetoquinol"},
-    {"Ticker": "VIRI.PA", "Name": "Viridien"},
-    {"Ticker": "VIRP.PA", "Name": "Virbac"},
-    {"Ticker": "VIV.PA", "Name": "Vivendi"},
-    {"Ticker": "VK.PA", "Name": "Vallourec"},
-    {"Ticker": "VLA.PA", "Name": "Valneva"},
-    {"Ticker": "VLTSA.PA", "Name": "Voltalia"},
-    {"Ticker": "VMX.PA", "Name": "Verimatrix"},
-    {"Ticker": "VRLA.PA", "Name": "Verallia"},
-    {"Ticker": "VU.PA", "Name": "Vusion Group"},
-    {"Ticker": "WAVE.PA", "Name": "Wavestone"},
-    {"Ticker": "WIIT.MI", "Name": "WIIT"},
-    {"Ticker": "WLN.PA", "Name": "Worldline"},
-    {"Ticker": "XFAB.PA", "Name": "X-Fab Silicon"},
-    {"Ticker": "ABEO.PA", "Name": "Abéo"},
-    {"Ticker": "AELIS.PA", "Name": "Aelis Farma"},
-    {"Ticker": "ANTIN.PA", "Name": "Antin Infrastructure Partners"},
-    {"Ticker": "LIN.PA",  "Name": "Linedata Services"},
-    {"Ticker": "MAAT.PA", "Name": "MaaT Pharma"},
-    {"Ticker": "NAE.PA",  "Name": "North Atlantic Energies"},
-    {"Ticker": "RF.PA",   "Name": "Eurazeo"},
-    {"Ticker": "TNG.PA", "Name": "Transgene"},
-    {"Ticker": "VIL.PA", "Name": "Viel & Cie"},
-    {"Ticker": "ALA.MI", "Name": "ALA"},
-    {"Ticker": "ALBLD.PA", "Name": "Bilendi"},
-    {"Ticker": "ALDNE.PA", "Name": "Dont Nod Ent."},
-    {"Ticker": "ALLDL.PA", "Name": "Groupe LDLC"},
-    {"Ticker": "ALWTR.PA", "Name": "Osmosun"},
-    {"Ticker": "ARAMI.PA", "Name": "Aramis Group"},
-    {"Ticker": "BOI.PA", "Name": "Boiron"},
-    {"Ticker": "CGM.PA", "Name": "Cegedim"},
-    {"Ticker": "GRVO.PA", "Name": "Graines Voltz"},
-    {"Ticker": "PHXM.PA", "Name": "PHAXIAM Therapeutics"},
-    {"Ticker": "XIL.PA", "Name": "Xilam Animation"},
-]
+import os
+from services.universe_store import UniverseStore, read_records
 
-LIST_2 = [
-    {"Ticker": "^STOXX50E"},
-    {"Ticker": "^GDAXI"},
-    {"Ticker": "^FCHI"},
-    {"Ticker": "FTSEMIB.MI"},
-    {"Ticker": "^VIX"},
-    {"Ticker": "EURUSD=X"},
-    {"Ticker": "GC=F"},
-    {"Ticker": "CL=F"},
-    {"Ticker": "BTC-EUR"},
-]
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+UNIVERSE_PATH = os.path.join(DATA_DIR, "universe.csv")
+EXCLUDED_PATH = os.path.join(DATA_DIR, "excluded.csv")
 
-LIST_3 = [
-    {"Ticker":"SXAE.Z"},
-    {"Ticker":"SX7E.Z"},
-    {"Ticker":"SXPE.Z"},
-    {"Ticker":"SX4E.Z"},
-    {"Ticker":"SX3E.Z"},
-    {"Ticker":"SXDE.Z"},
-    {"Ticker":"SXNE.Z"},
-    {"Ticker":"SXIE.Z"},
-    {"Ticker":"SXME.Z"},
-    {"Ticker":"SXEE.Z"},
-    {"Ticker":"SXOE.Z"},
-    {"Ticker":"SX8E.Z"},
-    {"Ticker":"SXKE.Z"},
-    {"Ticker":"SXTE.Z"},
-    {"Ticker":"SX6E.Z"},
-]
+# Tickers are maintained in universe.csv (ticker, name, list); excluded.csv
+# lists tickers that are never fetched whatever list they appear in.
+STORE = UniverseStore.from_file(UNIVERSE_PATH, EXCLUDED_PATH)
 
-GARBAGE_TICKERS = [
-{"Ticker": "ALA.MI", "Name": "ALA"},
-{"Ticker": "ALBLD.PA", "Name": "Bilendi"},
-{"Ticker": "ALDNE.PA", "Name": "Dont Nod Ent."},
-{"Ticker": "ALLDL.PA", "Name": "Groupe LDLC"},
-{"Ticker": "ALWTR.PA", "Name": "Osmosun"},
-{"Ticker": "ARAMI.PA", "Name": "Aramis Group"},
-{"Ticker": "BOI.PA", "Name": "Boiron"},
-{"Ticker": "CGM.PA", "Name": "Cegedim"},
-{"Ticker": "GRVO.PA", "Name": "Graines Voltz"},
-{"Ticker": "PHXM.PA", "Name": "PHAXIAM Therapeutics"},
-{"Ticker": "XIL.PA", "Name": "Xilam Animation"},
-]
\ No newline at end of file
+LIST_1 = STORE.select(lists=["LIST_1"]).records()
+LIST_2 = STORE.select(lists=["LIST_2"]).records()
+LIST_3 = STORE.select(lists=["LIST_3"]).records()
+
+GARBAGE_TICKERS = read_records(EXCLUDED_PATH)
@@ -1,34 +1,444 @@
+"""Daily closing report.
+
+    python main.py [run] [options]           fetch, compute and render today's report
+    python main.py validate-template [PATH]  check the placeholders of a template
+    python main.py list-universe             print the tickers of the universe
+    python main.py render-from-snapshot FILE render saved tables without downloading
+
+Heavy modules (numpy, pandas, python-docx, yfinance) are imported by the
+commands that need them, not when this file is loaded.
+"""
+import argparse
+import os
+import sys
+import time
+
+STARTED = time.perf_counter()
+
 from datetime import datetime
-from services.market_data_service import MarketDataService
-from services.word_service import WordService
-from data.universe import LIST_1, LIST_2, LIST_3
+from services.defaults import (
+    VOLUME_SOURCES, DEFAULT_VOLUME_SOURCE, DEFAULT_CACHE_PATH, DEFAULT_TTL, DEFAULT_HTTP_POOL_SIZE,
+    DEFAULT_VOLUME_STATS_PATH, DEFAULT_VOLUME_WINDOWS
+)
+from services.fetch_engine import DEFAULT_WORKERS, DEFAULT_RATE, DEFAULT_TIMEOUT, DEFAULT_RETRIES
+from services.failure_store import DEFAULT_FAILURE_STORE_PATH, DEFAULT_THRESHOLD
+from services.daemon import DEFAULT_OPEN_TIME, DEFAULT_CLOSE_TIME, DEFAULT_REFRESH_MINUTES, DEFAULT_STATUS_PORT
 
 TEMPLATE_PATH = "templates/closing_template.docx"
 OUTPUT_DIR = "output"
 
-def main():
+# In daemon mode cached bars must not hide the last minutes before the close
+DAEMON_CACHE_TTL = 60
+
+# Seconds of a --budget / --publish-by deadline kept for rendering and saving
+DEFAULT_RENDER_RESERVE = 5.0
+
+COMMANDS = ("run", "validate-template", "list-universe", "render-from-snapshot")
+
+def startup_seconds():
+    """Seconds since main.py was loaded, i.e. imports included"""
+    return time.perf_counter() - STARTED
+
+def report_startup(args):
+    if args.timings:
+        print(f"Startup: {startup_seconds():.3f}s", file=sys.stderr)
+
+def parse_args(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Without a command, options are those of "run" as before subcommands existed
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv = ["run"] + argv
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--timings", action="store_true", help="print the startup time (imports included) on stderr")
+
+    root = argparse.ArgumentParser(description="Generate the daily closing report")
+    commands = root.add_subparsers(dest="command", required=True)
+
+    parser = commands.add_parser("run", parents=[common], help="fetch, compute and render today's report (default)")
+    parser.add_argument("--replay", metavar="DIR", help="serve market data from recorded frames in DIR instead of Yahoo Finance")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per request in replay mode")
+    parser.add_argument("--record", metavar="DIR", help="save every downloaded frame to DIR for later replay")
+    parser.add_argument("--cache", metavar="PATH", help=f"local OHLCV cache (default: {DEFAULT_CACHE_PATH}, live data only)")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL, help="seconds during which cached bars are reused without any request")
+    parser.add_argument("--no-cache", action="store_true", help="always download the full history")
+    parser.add_argument("--invalidate-cache", action="store_true", help="drop every cached series before running")
+    parser.add_argument("--volume-source", choices=VOLUME_SOURCES, default=DEFAULT_VOLUME_SOURCE,
+                        help="today's volume for the most active ranking: daily bar or sum of intraday bars")
+    parser.add_argument("--volume-stats", metavar="PATH",
+                        help=f"rolling daily volume statistics (default: {DEFAULT_VOLUME_STATS_PATH}, live data only)")
+    parser.add_argument("--volume-windows", default=",".join(map(str, DEFAULT_VOLUME_WINDOWS)), metavar="N,N,...",
+                        help="sessions of the rolling volume windows kept (the 10-session one is always kept)")
+    parser.add_argument("--no-volume-stats", action="store_true",
+                        help="download the 11-session history for every average volume instead of using the store")
+    parser.add_argument("--prune-candidates", type=int, metavar="N",
+                        help="with an intraday volume source, fetch intraday bars only for the N best daily volume multiples")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent download requests")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="maximum requests per second: per ticker for live data, per call in replay (0 = unlimited)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds before a download attempt is abandoned")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="retries of a failed download attempt")
+    parser.add_argument("--http-pool-size", type=int, default=DEFAULT_HTTP_POOL_SIZE,
+                        help="send downloads through a pooled requests session with this many keep-alive connections per host "
+                             "instead of the run's browser-impersonating session (0 = that session)")
+    parser.add_argument("--http-base-url", metavar="URL",
+                        help="send every HTTP request to this server instead, e.g. a local stand-in of Yahoo Finance "
+                             "(implies a pooled session)")
+    parser.add_argument("--compiled-template", action="store_true",
+                        help="render by substituting directly in the template XML instead of through python-docx")
+    parser.add_argument("--from", dest="date_from", metavar="YYYY-MM-DD",
+                        help="backfill: write one report per trading day from this date")
+    parser.add_argument("--to", dest="date_to", metavar="YYYY-MM-DD",
+                        help="backfill: last day to report (default: today)")
+    parser.add_argument("--render-workers", type=int, help="processes rendering backfill reports or variants in parallel")
+    parser.add_argument("--variant", nargs=2, action="append", default=[], metavar=("TEMPLATE", "OUTPUT"),
+                        help="also render the same data into TEMPLATE, saved as OUTPUT ({date} is replaced by the day); repeatable")
+    parser.add_argument("--streaming", action="store_true",
+                        help="rank table 1 block by block with bounded memory instead of over the whole universe")
+    parser.add_argument("--budget", type=float, metavar="SECONDS",
+                        help="publish within this many seconds of the start, using last known bars for whatever is late")
+    parser.add_argument("--publish-by", metavar="HH:MM", help="publish by this time today, same fallback as --budget")
+    parser.add_argument("--render-reserve", type=float, default=DEFAULT_RENDER_RESERVE,
+                        help="seconds kept for rendering before the deadline")
+    parser.add_argument("--fallback-snapshot", metavar="PATH",
+                        help="snapshot whose bars replace late downloads (default: the OHLCV cache, whatever its age)")
+    parser.add_argument("--no-plan", action="store_true",
+                        help="let every table download its own history instead of planning merged requests up front")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="split every list across this many worker processes and merge their partial results")
+    parser.add_argument("--failure-store", metavar="PATH",
+                        help=f"consecutive failures per ticker (default: {DEFAULT_FAILURE_STORE_PATH}, live data only)")
+    parser.add_argument("--quarantine-after", type=int, default=DEFAULT_THRESHOLD,
+                        help="consecutive failed runs before a ticker is no longer fetched")
+    parser.add_argument("--no-quarantine", action="store_true", help="fetch every ticker and leave the failure store untouched")
+    parser.add_argument("--run-report", metavar="PATH", help="JSON run report (default: next to the docx)")
+    parser.add_argument("--snapshot", metavar="PATH", help="snapshot folder of the computed tables and bars (default: next to the docx)")
+    parser.add_argument("--prometheus", metavar="PATH", help="also write run metrics as a Prometheus textfile")
+    parser.add_argument("--profile", action="store_true", help="also record cProfile and tracemalloc output next to the docx")
+    parser.add_argument("--daemon", action="store_true",
+                        help="stay resident, refresh data during the session and publish at the close time")
+    parser.add_argument("--open-time", default=DEFAULT_OPEN_TIME, metavar="HH:MM", help="daemon: start of the refresh window")
+    parser.add_argument("--close-time", default=DEFAULT_CLOSE_TIME, metavar="HH:MM", help="daemon: publication time")
+    parser.add_argument("--refresh-minutes", type=float, default=DEFAULT_REFRESH_MINUTES, help="daemon: minutes between refreshes")
+    parser.add_argument("--status-port", type=int, default=DEFAULT_STATUS_PORT, help="daemon: local port of the /health endpoint")
+
+    parser = commands.add_parser("validate-template", parents=[common], help="check the placeholders of a template")
+    parser.add_argument("template", nargs="?", default=TEMPLATE_PATH)
+
+    parser = commands.add_parser("list-universe", parents=[common], help="print the tickers of the universe")
+    parser.add_argument("--list", dest="lists", action="append", metavar="NAME", help="only this list (LIST_1, ...); repeatable")
+    parser.add_argument("--exchange", dest="exchanges", action="append", metavar="SUFFIX",
+                        help="only tickers with this exchange suffix (PA, MI, ...); repeatable")
+
+    parser = commands.add_parser("render-from-snapshot", parents=[common], help="render saved tables without downloading")
+    parser.add_argument("snapshot", nargs="?", help="snapshot folder (default: today's)")
+    parser.add_argument("--template", default=TEMPLATE_PATH)
+    parser.add_argument("--output", help="report path (default: the dated report in the output folder)")
+    parser.add_argument("--compiled-template", action="store_true",
+                        help="render by substituting directly in the template XML instead of through python-docx")
+
+    return root.parse_args(argv)
+
+def build_provider(args, stats=None):
+    from services.market_data_provider import YFinanceProvider, ReplayProvider, RecordingProvider
+    from services.ohlcv_cache import OHLCVCache, CachingProvider
+    from services.run_stats import InstrumentedProvider
+    from services.fetch_engine import TokenBucket
+
+    # Live downloads are rate limited per ticker, replayed ones per call by the engine
+    limiter = None if args.replay else TokenBucket(args.rate)
+    if args.replay:
+        provider = ReplayProvider(args.replay, latency=args.latency)
+    elif args.http_pool_size > 0 or args.http_base_url:
+        from services.http_session import pooled_session, DEFAULT_POOL_SIZE
+
+        session = pooled_session(args.http_pool_size or DEFAULT_POOL_SIZE, base_url=args.http_base_url, stats=stats)
+        provider = YFinanceProvider(timeout=args.timeout, session=session, limiter=limiter)
+    else:
+        provider = YFinanceProvider(timeout=args.timeout, limiter=limiter)
+
+    # Below the cache so that only actual downloads are recorded
+    if stats is not None:
+        provider = InstrumentedProvider(provider, stats)
+
+    cache_path = args.cache or (None if args.replay else DEFAULT_CACHE_PATH)
+    if cache_path and not args.no_cache:
+        cache = OHLCVCache(cache_path, ttl=args.cache_ttl)
+        if args.invalidate_cache:
+            cache.invalidate()
+        provider = CachingProvider(provider, cache)
+
+    if args.record:
+        provider = RecordingProvider(provider, args.record)
+    return provider
+
+def build_failure_store(args):
+    from services.failure_store import FailureStore
+
+    path = args.failure_store or (None if args.replay else DEFAULT_FAILURE_STORE_PATH)
+    if path is None or args.no_quarantine:
+        return None
+    return FailureStore(path, threshold=args.quarantine_after)
+
+def build_volume_stats(args):
+    path = args.volume_stats or (None if args.replay else DEFAULT_VOLUME_STATS_PATH)
+    if path is None or args.no_volume_stats:
+        return None
+    from services.volume_stats import VolumeStatsStore
+    from services.market_data_service import VOLUME_AVERAGE_DAYS
+
+    windows = {int(window) for window in args.volume_windows.split(",") if window.strip()}
+    return VolumeStatsStore(path, windows | {VOLUME_AVERAGE_DAYS})
+
+def build_engine(args, stats=None):
+    from services.fetch_engine import FetchEngine
+
+    return FetchEngine(workers=args.workers, rate=args.rate if args.replay else 0, timeout=args.timeout, retries=args.retries, stats=stats,
+                       deadline=getattr(args, "fetch_deadline", None))
+
+def fetch_deadline(args):
+    """time.monotonic() after which downloads give way to last known bars, None without a deadline"""
+    budgets = []
+    if args.budget is not None:
+        budgets.append(args.budget - startup_seconds())
+    if args.publish_by:
+        hour, minute = (int(part) for part in args.publish_by.split(":"))
+        publish_at = datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
+        budgets.append((publish_at - datetime.now()).total_seconds())
+    if not budgets:
+        return None
+    return time.monotonic() + min(budgets) - args.render_reserve
+
+def build_fallback(args):
+    """Provider of last known bars for deadline runs"""
+    if getattr(args, "fetch_deadline", None) is None:
+        return None
+    if args.fallback_snapshot:
+        from services.market_data_provider import ReplayProvider
+        from services.snapshot import Snapshot
+
+        frames = {}
+        for (ticker, _, interval), frame in Snapshot(args.fallback_snapshot).frames().items():
+            # Keep the longest of the periods saved for a series
+            if len(frame) > len(frames.get((ticker, interval), ())):
+                frames[(ticker, interval)] = frame
+        return ReplayProvider(frames=frames)
+
+    cache_path = args.cache or (None if args.replay else DEFAULT_CACHE_PATH)
+    if cache_path is None or args.no_cache:
+        return None
+    from services.ohlcv_cache import OHLCVCache, StaleCacheProvider
+
+    return StaleCacheProvider(OHLCVCache(cache_path))
+
+def build_shard_service(args, stats):
+    """MarketDataService of one shard process (quarantine is handled by the coordinator)"""
+    from services.market_data_service import MarketDataService
+
+    return MarketDataService(
+        build_provider(args, stats),
+        engine=build_engine(args, stats),
+        volume_source=args.volume_source,
+        stats=stats,
+        streaming=args.streaming,
+        fallback=build_fallback(args)
+    )
+
+def backfill(args):
+    from services.backfill import run_backfill
+    from data.universe import LIST_1, LIST_2, LIST_3
+
+    date_to = args.date_to or datetime.today().strftime("%Y-%m-%d")
+    run_backfill(
+        build_provider(args),
+        build_engine(args),
+        (LIST_1, LIST_2, LIST_3),
+        args.date_from,
+        date_to,
+        TEMPLATE_PATH,
+        OUTPUT_DIR,
+        compiled=args.compiled_template,
+        render_workers=args.render_workers
+    )
+    print("\nDONE !")
+
+def daemon(args):
+    from services.market_data_service import MarketDataService
+    from services.intraday_volume import IntradayVolumeTracker
+    from services.daemon import ClosingDaemon
+    from data.universe import LIST_1, LIST_2, LIST_3
+
+    args.cache_ttl = min(args.cache_ttl, DAEMON_CACHE_TTL)
+    provider = build_provider(args)
+    engine = build_engine(args)
+
+    # Intraday volumes are accumulated across refreshes, polling only new bars
+    tracker = None
+    if args.volume_source != "daily":
+        tracker = IntradayVolumeTracker(provider, engine, interval=args.volume_source)
+
+    volume_stats = build_volume_stats(args)
+
+    ClosingDaemon(
+        lambda: MarketDataService(provider, engine=engine, volume_source=args.volume_source, intraday_tracker=tracker,
+                                  volume_stats=volume_stats),
+        (LIST_1, LIST_2, LIST_3),
+        TEMPLATE_PATH,
+        OUTPUT_DIR,
+        open_time=args.open_time,
+        close_time=args.close_time,
+        refresh_minutes=args.refresh_minutes,
+        port=args.status_port
+    ).run()
+
+def run(args):
+    if args.date_from:
+        backfill(args)
+        return
+    if args.daemon:
+        daemon(args)
+        return
+
+    import cProfile
+    import functools
+    import tracemalloc
+    from services.market_data_service import MarketDataService
+    from services.sharding import ShardedMarketDataService
+    from services.report import render_report, render_variants, report_path, degraded_cells
+    from services.run_stats import RunStats
+    from services.snapshot import save_snapshot
+    from services.http_session import connection_reuse
+    from data.universe import LIST_1, LIST_2, LIST_3
+
+    report_startup(args)
     today = datetime.today()
-    file_date = today.strftime("%Y-%m-%d")
-    display_date = today.strftime("%B %d, %Y").replace(" 0", " ")
-    display_date = display_date.replace("1,", "1st,").replace("2,", "2nd,").replace("3,", "3rd,")
-    display_date = display_date.replace("21,", "21st,").replace("22,", "22nd,").replace("23,", "23rd,")
-    display_date = display_date.replace("31,", "31st,")
+    output_file = report_path(OUTPUT_DIR, today)
+    run_report = args.run_report or output_file.replace(".docx", " run report.json")
+    snapshot = args.snapshot or output_file.replace(".docx", " snapshot")
 
-    output_file = f"{OUTPUT_DIR}/{file_date} daily closing.docx"
+    stats = RunStats()
+    stats.info["startup_seconds"] = round(startup_seconds(), 3)
+    args.fetch_deadline = fetch_deadline(args)
+    if args.profile:
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        profiler.enable()
 
-    market_service = MarketDataService()
-    word_service = WordService(TEMPLATE_PATH)
+    if args.shards > 1:
+        market_service = ShardedMarketDataService(
+            functools.partial(build_shard_service, args),
+            args.shards,
+            volume_source=args.volume_source,
+            stats=stats,
+            failure_store=build_failure_store(args)
+        )
+    else:
+        market_service = MarketDataService(
+            build_provider(args, stats),
+            engine=build_engine(args, stats),
+            volume_source=args.volume_source,
+            stats=stats,
+            failure_store=build_failure_store(args),
+            streaming=args.streaming,
+            fallback=build_fallback(args),
+            volume_stats=build_volume_stats(args),
+            prune_candidates=args.prune_candidates
+        )
+
+    planner = None
+    if args.shards == 1 and not args.streaming and not args.no_plan:
+        planner = market_service.plan(LIST_1, LIST_2, LIST_3)
+        market_service.execute_plan(planner)
+        stats.info["fetch_plan"] = {
+            "naive_calls": planner.naive_calls(),
+            "planned_calls": planner.planned_calls(),
+            "estimated_bars": planner.estimated_bars()
+        }
 
     table1_data = market_service.compute_table_1(LIST_1)
     table2_data = market_service.compute_table_2(LIST_2)
     table3_data = market_service.compute_table_3(LIST_3)
+    with stats.span("snapshot.save"):
+        save_snapshot(snapshot, today, (table1_data, table2_data, table3_data), market_service.fetched_frames(),
+                      info={"unavailable_tickers": market_service.unavailable_tickers})
+
+    render_report(
+        TEMPLATE_PATH,
+        output_file,
+        today,
+        (table1_data, table2_data, table3_data),
+        compiled=args.compiled_template,
+        stats=stats
+    )
+
+    variants = []
+    if args.variant:
+        with stats.span("variants.render"):
+            variants = render_variants(
+                [(template, output.format(date=today.strftime("%Y-%m-%d"))) for template, output in args.variant],
+                today,
+                (table1_data, table2_data, table3_data),
+                compiled=args.compiled_template,
+                workers=args.render_workers
+            )
+        stats.info["variants"] = variants
 
-    word_service.replace_date(display_date)
-    word_service.fill_table_1(table1_data)
-    word_service.fill_table_2(table2_data)
-    word_service.fill_table_3(table3_data)
+    if args.profile:
+        profiler.disable()
+        profiler.dump_stats(output_file.replace(".docx", " profile.pstats"))
+        with open(output_file.replace(".docx", " tracemalloc.txt"), "w") as f:
+            for line in tracemalloc.take_snapshot().statistics("lineno")[:50]:
+                f.write(f"{line}\n")
+        tracemalloc.stop()
 
-    word_service.save(output_file)
+    deadline_hit = args.fetch_deadline is not None and time.monotonic() >= args.fetch_deadline
+    degraded = degraded_cells((table1_data, table2_data, table3_data), LIST_1, market_service.stale_tickers)
+    if args.fetch_deadline is not None:
+        stats.info["deadline"] = {
+            "hit": deadline_hit,
+            "stale_tickers": market_service.stale_tickers,
+            "degraded_cells": degraded
+        }
+
+    reuse = connection_reuse(stats.counters)
+    if reuse is not None:
+        stats.info["http_connection_reuse"] = round(reuse, 4)
+    stats.info["unavailable_tickers"] = market_service.unavailable_tickers
+    stats.info["quarantined_tickers"] = market_service.quarantined_tickers
+    if market_service.failure_store is not None:
+        stats.info["quarantine"] = market_service.failure_store.quarantined()
+    stats.write_json(run_report)
+    if args.prometheus:
+        stats.write_prometheus(args.prometheus)
+
+    print(f"\nVolume multiple source: {market_service.volume_source}")
+    print("\nTimings:")
+    print(f"  {'startup':<16} {stats.info['startup_seconds']:7.2f}s")
+    for name, seconds in stats.spans.items():
+        print(f"  {name:<16} {seconds:7.2f}s")
+    print(f"  {stats.counters['network_calls']} network calls, {stats.counters['retries']} retries (run report: {run_report})")
+    if reuse is not None:
+        print(f"  HTTP: {stats.counters['http_requests']} requests on {stats.counters['http_connections_opened']} new connections "
+              f"({reuse:.0%} reused), {stats.counters['http_not_modified']} not modified")
+    print(f"  Snapshot: {snapshot}")
+    if market_service.volume_stats is not None:
+        print(f"  Average volumes: {stats.counters['volume_stats_current']} tickers from the rolling store, "
+              f"{stats.counters['volume_stats_seeded']} seeded ({market_service.volume_stats.path})")
+    if planner is not None:
+        plan = stats.info["fetch_plan"]
+        received = sum(entry["bars"] for entry in stats.fetches)
+        print(f"\nFetch plan: {plan['planned_calls']} requests planned ({plan['naive_calls']} without merging), "
+              f"~{plan['estimated_bars']} bars expected from the trading calendar")
+        print(f"  actual: {stats.counters['network_calls']} network calls, {received} bars received")
+
+    pruning = stats.info.get("pruning")
+    if pruning is not None:
+        print(f"\nCandidate pruning: intraday volume fetched for {pruning['candidates']} of {pruning['scanned']} tickers")
+        if pruning["exact"]:
+            print("  ✓ most active ranking identical to a full scan"
+                  + (f" (pruned tickers bounded at {pruning['bound']:.2f}x < {pruning['last_shown']:.2f}x)" if pruning["pruned"] else ""))
+        else:
+            print("  ⚠ most active ranking may differ from a full scan"
+                  + (f" (pruned tickers could reach {pruning['bound']:.2f}x)" if pruning["bound"] is not None else ""))
 
     if market_service.unavailable_tickers:
         print("\n✗ Unavailable tickers (skipped):")
@@ -36,8 +446,81 @@ def main():
             print(f"  - {ticker}")
     else:
         print("\n✓ All tickers loaded successfully")
+
+    if deadline_hit:
+        print(f"\n⚠ Deadline reached: {len(market_service.stale_tickers)} tickers use last known bars")
+        for cell, ticker in degraded.items():
+            print(f"  - {cell}: stale ({ticker})")
+        if not degraded:
+            print("  none of them is shown in the report")
+
+    if market_service.quarantined_tickers:
+        quarantine = market_service.failure_store.quarantined()
+        print("\n⏸ Quarantined tickers (not fetched):")
+        for ticker in market_service.quarantined_tickers:
+            entry = quarantine[ticker]
+            print(f"  - {ticker}: {entry['failures']} failed runs, next probe {entry['next_probe']}")
+
+    if variants:
+        print("\nVariants:")
+        for variant in variants:
+            if variant["error"] is None:
+                print(f"  ✓ {variant['output']} ({variant['seconds']:.2f}s)")
+            else:
+                print(f"  ✗ {variant['template']}: {variant['error']}")
     
     print("\nDONE !")
 
+def validate_template(args):
+    from services.report import validate_template as validate
+    from data.universe import LIST_2, LIST_3
+
+    found, missing, unknown = validate(args.template, len(LIST_2), len(LIST_3))
+    report_startup(args)
+
+    print(f"{args.template}: {len(found)} placeholders")
+    for placeholder in missing:
+        print(f"  ✗ missing: {placeholder} (its value is never written)")
+    for placeholder in unknown:
+        print(f"  ✗ unknown: {placeholder} (left as is in the report)")
+    if not missing and not unknown:
+        print("  ✓ every placeholder is filled")
+    return 1 if missing or unknown else 0
+
+def list_universe(args):
+    from data.universe import STORE
+
+    universe = STORE.select(lists=args.lists, exchanges=args.exchanges)
+    report_startup(args)
+
+    for ticker, name, list_name in zip(universe.tickers, universe.names, universe.lists):
+        print(f"{list_name:<8} {ticker:<12} {name}")
+    print(f"{len(universe)} rows, {len(universe.unique_tickers())} tickers, {len(STORE.excluded)} excluded", file=sys.stderr)
+
+def render_from_snapshot(args):
+    from services.report import render_report, report_path
+    from services.snapshot import load_snapshot
+
+    path = args.snapshot or report_path(OUTPUT_DIR, datetime.today()).replace(".docx", " snapshot")
+    date, tables, _ = load_snapshot(path)
+    report_startup(args)
+
+    output_file = args.output or report_path(OUTPUT_DIR, date)
+    if os.path.dirname(output_file):
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    started = time.perf_counter()
+    render_report(args.template, output_file, date, tables, compiled=args.compiled_template)
+    print(f"{output_file} rendered in {time.perf_counter() - started:.2f}s")
+
+def main():
+    args = parse_args()
+    handlers = {
+        "run": run,
+        "validate-template": validate_template,
+        "list-universe": list_universe,
+        "render-from-snapshot": render_from_snapshot
+    }
+    return handlers[args.command](args)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
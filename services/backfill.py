@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from services.market_data_service import MarketDataService, BULK_CHUNK_SIZE
+from services.market_data_provider import ReplayProvider
+from services.fetch_engine import FetchEngine
+from services.report import render_report, report_path
+
+# Daily bars needed before the first reported day (table 3 reads 60 sessions)
+LOOKBACK_SESSIONS = 60
+
+
+def fetch_history(provider, engine, tickers, start, chunk_size=BULK_CHUNK_SIZE):
+    """Download daily bars from `start` for every ticker in grouped calls: {ticker: frame}"""
+    tickers = list(dict.fromkeys(tickers))
+    chunks = [tuple(tickers[i:i + chunk_size]) for i in range(0, len(tickers), chunk_size)]
+
+    frames = {}
+    for result in engine.map(lambda chunk: provider.download(list(chunk), None, "1d", start=start), chunks):
+        frames.update(result or {})
+    return frames
+
+
+def trading_days(frames, date_from, date_to):
+    """Sessions between the two dates (inclusive) on which at least one ticker traded"""
+    days = set()
+    for frame in frames.values():
+        index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+        days.update(index.normalize()[(index >= date_from) & (index < date_to + pd.Timedelta(days=1))])
+    return sorted(days)
+
+
+def compute_as_of(frames, day, lists):
+    """Tables 1-3 as a closing run on `day` would have computed them, from in-memory history"""
+    list_1, list_2, list_3 = lists
+    provider = ReplayProvider(frames={(t, "1d"): f for t, f in frames.items()}, as_of=day)
+    # Everything is in memory: no concurrency, and intraday bars are not kept historically
+    service = MarketDataService(provider, engine=FetchEngine(workers=1, rate=0), volume_source="daily")
+
+    tables = (
+        service.compute_table_1(list_1),
+        service.compute_table_2(list_2),
+        service.compute_table_3(list_3)
+    )
+    return tables, service.unavailable_tickers
+
+
+def run_backfill(provider, engine, lists, date_from, date_to, template_path, output_dir,
+                 compiled=False, render_workers=None):
+    """Write one report per trading day in [date_from, date_to] from a single history download"""
+    date_from = pd.Timestamp(date_from).normalize()
+    date_to = pd.Timestamp(date_to).normalize()
+    tickers = [item["Ticker"] for universe in lists for item in universe]
+
+    start = date_from - pd.offsets.BDay(LOOKBACK_SESSIONS + 5)
+    frames = fetch_history(provider, engine, tickers, start)
+    days = trading_days(frames, date_from, date_to)
+    print(f"Fetched {len(frames)}/{len(set(tickers))} tickers, {len(days)} trading days to render")
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    with ProcessPoolExecutor(max_workers=render_workers) as executor:
+        futures = []
+        for day in days:
+            tables, unavailable = compute_as_of(frames, day, lists)
+            output_file = report_path(output_dir, day)
+            futures.append((day, unavailable, executor.submit(
+                render_report, template_path, output_file, day, tables, compiled
+            )))
+
+        for day, unavailable, future in futures:
+            written.append(future.result())
+            note = f" ({len(unavailable)} unavailable tickers)" if unavailable else ""
+            print(f"  {day:%Y-%m-%d} -> {written[-1]}{note}")
+
+    return written
@@ -0,0 +1,143 @@
+import copy
+import os
+import re
+import zipfile
+from functools import lru_cache
+from lxml import etree
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from services.word_service import (
+    PLACEHOLDER_PATTERN, plan_replacements, rewrite_paragraph,
+    date_values, table_1_values, market_table_values
+)
+
+DOCUMENT_PART = "word/document.xml"
+
+# Namespace declarations lxml repeats on a serialized sub-element
+NAMESPACE_DECLARATION = re.compile(rb'\s+xmlns:(\w+)="[^"]*"')
+
+
+class CompiledTemplate:
+    """A .docx template parsed once into reusable pieces.
+
+    The zip parts are kept as raw bytes and word/document.xml is split around
+    the paragraphs holding placeholders ("slots"). Rendering only rebuilds the
+    slots that receive a value, with the same python-docx run styling as
+    WordService, and joins the pieces back into a new zip. No python-docx
+    Document is built.
+    """
+
+    def __init__(self, template_path):
+        self.template_path = template_path
+
+        with zipfile.ZipFile(template_path) as archive:
+            self._parts = [(info, archive.read(info.filename)) for info in archive.infolist()]
+        document_xml = next(data for info, data in self._parts if info.filename == DOCUMENT_PART)
+
+        root = parse_xml(document_xml)
+        self._root_prefixes = {prefix.encode() for prefix in root.nsmap if prefix}
+
+        # Same paragraph order as WordService._iter_paragraphs
+        body = root.find(qn("w:body"))
+        paragraphs = body.findall(qn("w:p"))
+        for table in body.findall(qn("w:tbl")):
+            for row in table.findall(qn("w:tr")):
+                for cell in row.findall(qn("w:tc")):
+                    paragraphs.extend(cell.findall(qn("w:p")))
+
+        self._slots = []    # paragraph elements holding placeholders
+        self._texts = {}    # slot -> paragraph text
+        self._index = {}    # placeholder -> slots, in document order
+        for p in paragraphs:
+            full_text = "".join(r.text for r in p.r_lst)
+            placeholders = dict.fromkeys(PLACEHOLDER_PATTERN.findall(full_text))
+            if not placeholders:
+                continue
+            slot = len(self._slots)
+            self._slots.append(p)
+            self._texts[slot] = full_text
+            for placeholder in placeholders:
+                self._index.setdefault(placeholder, []).append(slot)
+
+        # Serialize once with a marker in place of every slot, then split on them
+        self._original = [self._serialize(p) for p in self._slots]
+        for slot, p in enumerate(self._slots):
+            p.addprevious(etree.Comment(f"SLOT{slot}"))
+            p.getparent().remove(p)
+        xml = etree.tostring(root, encoding="UTF-8", standalone=True)
+        self._segments = re.split(rb"<!--SLOT\d+-->", xml)
+
+        if len(self._segments) != len(self._slots) + 1:
+            raise ValueError(f"Could not split {template_path} around its placeholders")
+
+    def _serialize(self, p):
+        xml = etree.tostring(p, encoding="UTF-8")
+        # Drop namespace declarations (all on the opening tag) already made on the document root
+        end = xml.index(b">")
+        head = NAMESPACE_DECLARATION.sub(
+            lambda m: b"" if m.group(1) in self._root_prefixes else m.group(0), xml[:end]
+        )
+        return head + xml[end:]
+
+    def placeholders(self):
+        return list(self._index)
+
+    def render(self, values, path):
+        """Write the template with `values` substituted to path.
+
+        `values` is a {placeholder: text | (text, color)} dict or a list of
+        such pairs, applied in order.
+        """
+        pieces = list(self._original)
+        for slot, (full_text, start, end, color) in plan_replacements(self._index, self._texts, values).items():
+            p = copy.deepcopy(self._slots[slot])
+            rewrite_paragraph(Paragraph(p, None), full_text, start, end, color)
+            pieces[slot] = self._serialize(p)
+
+        document_xml = self._segments[0] + b"".join(
+            piece + segment for piece, segment in zip(pieces, self._segments[1:])
+        )
+
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for info, data in self._parts:
+                archive.writestr(info, document_xml if info.filename == DOCUMENT_PART else data)
+
+    def new_document(self):
+        return CompiledDocument(self)
+
+
+class CompiledDocument:
+    """WordService-compatible front end collecting values for one CompiledTemplate render"""
+
+    def __init__(self, template):
+        self.template = template
+        self.values = []
+
+    def render(self, values):
+        self.values.extend(values.items())
+
+    def replace_date(self, date_str):
+        self.render(date_values(date_str))
+
+    def fill_table_1(self, data):
+        self.render(table_1_values(data))
+
+    def fill_table_2(self, data):
+        self.render(market_table_values(data, table_num=2, start_mvt_index=1))
+
+    def fill_table_3(self, data):
+        self.render(market_table_values(data, table_num=3, start_mvt_index=10))
+
+    def save(self, path):
+        self.template.render(self.values, path)
+
+
+@lru_cache(maxsize=None)
+def _compile(template_path, mtime):
+    return CompiledTemplate(template_path)
+
+
+def load_compiled_template(template_path):
+    """Compile a template once per process, recompiling when the file changes"""
+    return _compile(os.path.abspath(template_path), os.path.getmtime(template_path))
@@ -0,0 +1,202 @@
+import json
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_OPEN_TIME = "09:00"
+DEFAULT_CLOSE_TIME = "17:45"
+DEFAULT_REFRESH_MINUTES = 15
+DEFAULT_STATUS_PORT = 8765
+
+# Longest sleep of the scheduler loop, so wall-clock changes are noticed
+MAX_SLEEP = 30.0
+
+
+def _at(day, hhmm):
+    hour, minute = (int(part) for part in hhmm.split(":"))
+    return day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+class ClosingDaemon:
+    """Resident process publishing the closing report at a fixed time.
+
+    At start-up it compiles the template and runs a full computation, which
+    fills the provider's cache with history. During the session (weekdays
+    between open_time and close_time) it recomputes the tables every
+    `refresh_minutes`, so that at close_time only the latest bars are
+    missing and the report is written within seconds. A JSON status is
+    served on http://127.0.0.1:<port>/health.
+
+    `build_service` returns a new MarketDataService for every computation;
+    services share the provider (and its cache) passed to them by the caller.
+    """
+
+    def __init__(self, build_service, lists, template_path, output_dir, open_time=DEFAULT_OPEN_TIME,
+                 close_time=DEFAULT_CLOSE_TIME, refresh_minutes=DEFAULT_REFRESH_MINUTES,
+                 port=DEFAULT_STATUS_PORT):
+        self.build_service = build_service
+        self.lists = lists
+        self.template_path = template_path
+        self.output_dir = output_dir
+        self.open_time = open_time
+        self.close_time = close_time
+        self.refresh_interval = timedelta(minutes=refresh_minutes)
+        self.port = port
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._server = None
+        self.status = {
+            "state": "starting",
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "last_refresh": None,
+            "last_refresh_seconds": None,
+            "last_publish": None,
+            "last_publish_seconds": None,
+            "last_report": None,
+            "next_publish": None,
+            "unavailable_tickers": [],
+            "last_error": None
+        }
+        self._published_on = None
+        self._next_refresh = None
+
+    # --------------------------------------------------
+    # STATUS
+    # --------------------------------------------------
+
+    def _update_status(self, **fields):
+        with self._lock:
+            self.status.update(fields)
+
+    def snapshot_status(self):
+        with self._lock:
+            return dict(self.status)
+
+    def _start_status_server(self):
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/health", "/status"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(daemon.snapshot_status()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), StatusHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"Status endpoint: http://127.0.0.1:{self._server.server_address[1]}/health")
+
+    # --------------------------------------------------
+    # WORK
+    # --------------------------------------------------
+
+    def _compute(self):
+        service = self.build_service()
+        list_1, list_2, list_3 = self.lists
+        tables = (
+            service.compute_table_1(list_1),
+            service.compute_table_2(list_2),
+            service.compute_table_3(list_3)
+        )
+        return tables, service.unavailable_tickers
+
+    def refresh(self):
+        started = time.perf_counter()
+        self._update_status(state="refreshing")
+        tables, unavailable = self._compute()
+        self._update_status(
+            state="idle",
+            last_refresh=datetime.now().isoformat(timespec="seconds"),
+            last_refresh_seconds=round(time.perf_counter() - started, 3),
+            unavailable_tickers=unavailable
+        )
+        return tables
+
+    def publish(self, now):
+        from services.report import render_report, report_path
+
+        started = time.perf_counter()
+        self._update_status(state="publishing")
+        tables, unavailable = self._compute()
+        output_file = render_report(self.template_path, report_path(self.output_dir, now), now, tables, compiled=True)
+        elapsed = time.perf_counter() - started
+
+        self._published_on = now.date()
+        self._update_status(
+            state="idle",
+            last_publish=datetime.now().isoformat(timespec="seconds"),
+            last_publish_seconds=round(elapsed, 3),
+            last_report=output_file,
+            unavailable_tickers=unavailable
+        )
+        print(f"[{now:%Y-%m-%d %H:%M:%S}] Published {output_file} in {elapsed:.1f}s ({len(unavailable)} unavailable tickers)")
+
+    def _in_session(self, now):
+        return now.weekday() < 5 and _at(now, self.open_time) <= now < _at(now, self.close_time)
+
+    def _next_publish(self, now):
+        """Close time of the next weekday without a report (now if today's is overdue)"""
+        day = now
+        while day.weekday() >= 5 or self._published_on == day.date():
+            day = _at(day, "00:00") + timedelta(days=1)
+        return max(_at(day, self.close_time), now)
+
+    def tick(self, now):
+        """Run whatever is due at `now` and return the next wake-up time"""
+        publish_at = self._next_publish(now)
+        self._update_status(next_publish=publish_at.isoformat(timespec="seconds"))
+
+        if now >= publish_at:
+            self.publish(now)
+            return now
+        if self._in_session(now) and (self._next_refresh is None or now >= self._next_refresh):
+            self.refresh()
+            self._next_refresh = now + self.refresh_interval
+
+        wake = [publish_at]
+        if self._in_session(now):
+            wake.append(self._next_refresh)
+        return min(wake)
+
+    # --------------------------------------------------
+    # LIFECYCLE
+    # --------------------------------------------------
+
+    def preload(self):
+        from services.compiled_template import load_compiled_template
+
+        load_compiled_template(self.template_path)
+        self.refresh()
+
+    def run(self):
+        self._start_status_server()
+        try:
+            self.preload()
+            while not self._stop.is_set():
+                try:
+                    wake = self.tick(datetime.now())
+                except Exception as error:
+                    traceback.print_exc()
+                    self._update_status(state="error", last_error=repr(error))
+                    wake = datetime.now() + self.refresh_interval
+                sleep = max(0.0, (wake - datetime.now()).total_seconds())
+                self._stop.wait(min(sleep, MAX_SLEEP))
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
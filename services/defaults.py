@@ -0,0 +1,27 @@
+"""Defaults shared by the services and the command line.
+
+They live here rather than in the modules using them because those import
+numpy, pandas or python-docx, which the CLI must not load just to build its
+argument parser.
+"""
+
+# Where today's volume comes from for the "most active" ranking: the daily bar
+# (no extra download) or the sum of today's intraday bars at that interval
+VOLUME_SOURCES = ("daily", "15m", "5m", "1m")
+DEFAULT_VOLUME_SOURCE = "daily"
+
+DEFAULT_CACHE_PATH = "cache/ohlcv.sqlite"
+
+# Seconds during which a cached series is served without asking the provider
+DEFAULT_TTL = 15 * 60
+
+# Keep-alive connections per host of a pooled requests session, the transport
+# of local stand-ins. 0 keeps the provider's curl_cffi session, which
+# impersonates a browser as Yahoo expects
+DEFAULT_HTTP_POOL_SIZE = 0
+
+DEFAULT_VOLUME_STATS_PATH = "cache/volume_stats.npz"
+
+# Windows (in sessions) of the rolling volume statistics; the volume
+# multiple reads the 10-session average
+DEFAULT_VOLUME_WINDOWS = (10, 20, 50)
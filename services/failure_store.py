@@ -0,0 +1,94 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+DEFAULT_FAILURE_STORE_PATH = "cache/failures.json"
+
+# Consecutive failed runs before a ticker stops being fetched
+DEFAULT_THRESHOLD = 3
+# Days before the first re-probe of a quarantined ticker, doubled after each failed probe
+BASE_BACKOFF_DAYS = 1
+MAX_BACKOFF_DAYS = 32
+
+
+class FailureStore:
+    """Persistent record of tickers that keep coming back without data.
+
+    A ticker failing `threshold` runs in a row is quarantined: it is no
+    longer fetched until its next probe date. A failed probe doubles the wait
+    (up to MAX_BACKOFF_DAYS), a successful one clears the ticker.
+    """
+
+    def __init__(self, path=DEFAULT_FAILURE_STORE_PATH, threshold=DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        # ticker -> {"failures": int, "last_failure": iso date, "next_probe": iso date | None}
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(self.path + ".tmp", self.path)
+
+    def is_quarantined(self, ticker, now=None):
+        entry = self.entries.get(ticker)
+        if entry is None or entry["next_probe"] is None:
+            return False
+        return (now or datetime.now()) < datetime.fromisoformat(entry["next_probe"])
+
+    def record_failure(self, ticker, now=None):
+        now = now or datetime.now()
+        entry = self.entries.setdefault(ticker, {"failures": 0, "last_failure": None, "next_probe": None})
+        entry["failures"] += 1
+        entry["last_failure"] = now.isoformat(timespec="seconds")
+
+        if entry["failures"] >= self.threshold:
+            days = min(MAX_BACKOFF_DAYS, BASE_BACKOFF_DAYS * 2 ** (entry["failures"] - self.threshold))
+            entry["next_probe"] = (now + timedelta(days=days)).isoformat(timespec="seconds")
+
+    def record_success(self, ticker):
+        self.entries.pop(ticker, None)
+
+    def record_run(self, tickers, failed):
+        """Record which of the tickers requested by a run failed.
+
+        Nothing is recorded when every ticker failed: the source was down,
+        which says nothing about the tickers themselves.
+        """
+        tickers = set(tickers)
+        failed = set(failed) & tickers
+        if not tickers or failed == tickers:
+            return
+        for ticker in tickers:
+            if ticker in failed:
+                self.record_failure(ticker)
+            else:
+                self.record_success(ticker)
+
+    def admit(self, universe):
+        """Split the items of a table's universe into (items to fetch, quarantined tickers)"""
+        quarantined = [item["Ticker"] for item in universe if self.is_quarantined(item["Ticker"])]
+        skipped = set(quarantined)
+        return [item for item in universe if item["Ticker"] not in skipped], quarantined
+
+    def record_table(self, universe, failed, abandoned=()):
+        """record_run() of the items a table fetched, then save.
+
+        Tickers abandoned at the fetch deadline are left out: being cut off
+        says nothing about their data.
+        """
+        abandoned = set(abandoned)
+        self.record_run([item["Ticker"] for item in universe if item["Ticker"] not in abandoned], failed)
+        self.save()
+
+    def quarantined(self, now=None):
+        """Quarantined tickers with their failure count and next probe date"""
+        return {
+            ticker: entry for ticker, entry in sorted(self.entries.items())
+            if self.is_quarantined(ticker, now)
+        }
@@ -0,0 +1,202 @@
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 5.0          # requests per second
+DEFAULT_TIMEOUT = 30.0      # seconds per attempt
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5       # seconds before the first retry, doubled on each attempt
+MAX_BACKOFF = 8.0
+POLL_INTERVAL = 0.1
+
+
+# Timeout clock (the `started` list) of the FetchEngine attempt running on the current thread
+_clock = threading.local()
+
+
+class DeadlineExceeded(Exception):
+    """Error of items abandoned because the engine's deadline passed"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` banked"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Take `tokens` tokens. More than `capacity` waits for a full bucket and
+        leaves it in debt, so the average rate still holds.
+
+        Called within a FetchEngine attempt (e.g. by a provider), the wait
+        holds the attempt's timeout: nothing has been sent yet.
+        """
+        if not self.rate:
+            return
+        needed = min(tokens, self.capacity)
+        started = getattr(_clock, "started", None)
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    if started and waited:
+                        started[0] = now
+                    return
+                wait_for = (needed - self._tokens) / self.rate
+            if started:
+                # The attempt's timeout starts once the tokens are there
+                started[0] = now + wait_for
+            waited = True
+            time.sleep(wait_for)
+
+
+class FetchEngine:
+    """Runs fetch calls on a bounded thread pool.
+
+    Every attempt waits for a rate-limiter token, is abandoned after `timeout`
+    seconds (not counting waits on a TokenBucket inside the call) and failed
+    attempts (exception or timeout) are retried up to `retries` times with
+    jittered exponential backoff. Attempts that time out keep their worker
+    thread until the underlying call returns, their result is discarded.
+
+    Once the optional `deadline` (a time.monotonic() value) has passed, no
+    attempt is started or waited for any more: the remaining items map to
+    None with a DeadlineExceeded error.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, burst=None, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, stats=None, deadline=None):
+        self.workers = workers
+        self.limiter = TokenBucket(rate, burst)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.errors = {}
+        # Optional RunStats counting retries, timeouts and failures
+        self.stats = stats
+        self.deadline = deadline
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def _count(self, name):
+        if self.stats is not None:
+            self.stats.count(name)
+
+    def _attempt(self, fn, item, started):
+        self.limiter.acquire()
+        # The timeout only runs once the request is actually sent
+        started.append(time.monotonic())
+        _clock.started = started
+        try:
+            return fn(item)
+        finally:
+            _clock.started = None
+
+    def _delay(self, attempt):
+        delay = min(MAX_BACKOFF, self.backoff * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def map(self, fn, items):
+        """Return [fn(item) for item in items], computed concurrently.
+
+        Items whose every attempt failed map to None and their last error is
+        kept in `self.errors`, keyed by item: items must be hashable (chunks of
+        tickers are tuples).
+        """
+        items = list(items)
+        results = [None] * len(items)
+        if not items:
+            return results
+        if self.expired():
+            for item in items:
+                self.errors[item] = DeadlineExceeded("deadline passed before the request")
+                self._count("deadline_abandoned")
+            return results
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        running = {}        # future -> (index, attempt, [start time once running])
+        retry_at = []       # heap of (time, index, attempt)
+
+        def submit(index, attempt):
+            started = []
+            future = executor.submit(self._attempt, fn, items[index], started)
+            running[future] = (index, attempt, started)
+
+        def failed(index, attempt, error):
+            self.errors[items[index]] = error
+            self._count("timeouts" if isinstance(error, TimeoutError) else "failed_attempts")
+            if attempt >= self.retries:
+                self._count("failures")
+            else:
+                self._count("retries")
+                heapq.heappush(retry_at, (time.monotonic() + self._delay(attempt), index, attempt + 1))
+
+        def abandon():
+            pending = [index for index, _, _ in running.values()] + [index for _, index, _ in retry_at]
+            for future in running:
+                future.cancel()
+            running.clear()
+            retry_at.clear()
+            for index in pending:
+                self.errors[items[index]] = DeadlineExceeded("deadline passed before a response")
+                self._count("deadline_abandoned")
+
+        try:
+            for index in range(len(items)):
+                submit(index, 0)
+
+            while running or retry_at:
+                if self.expired():
+                    abandon()
+                    break
+
+                now = time.monotonic()
+                while retry_at and retry_at[0][0] <= now:
+                    _, index, attempt = heapq.heappop(retry_at)
+                    submit(index, attempt)
+
+                # Wake up for the next completion, timeout or scheduled retry
+                deadlines = [started[0] + self.timeout for _, _, started in running.values() if started]
+                if retry_at:
+                    deadlines.append(retry_at[0][0])
+                if any(not started for _, _, started in running.values()):
+                    # Some attempts are still queued: poll until they start
+                    deadlines.append(now + POLL_INTERVAL)
+                if self.deadline is not None:
+                    deadlines.append(self.deadline)
+                wake = max(0.0, min(deadlines) - now)
+                if not running:
+                    time.sleep(wake)
+                    continue
+                done, _ = wait(list(running), timeout=wake, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index, attempt, _ = running.pop(future)
+                    try:
+                        results[index] = future.result()
+                        self.errors.pop(items[index], None)
+                    except Exception as error:
+                        failed(index, attempt, error)
+
+                now = time.monotonic()
+                for future, (index, attempt, started) in list(running.items()):
+                    if started and now - started[0] >= self.timeout:
+                        running.pop(future)
+                        future.cancel()
+                        failed(index, attempt, TimeoutError(f"no response after {self.timeout:.0f}s"))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
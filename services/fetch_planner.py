@@ -0,0 +1,106 @@
+import math
+from datetime import date, datetime, timedelta
+from services.market_data_provider import period_to_days
+
+# Regular Euronext session (09:00-17:30), used to estimate intraday bars.
+# The estimate is a diagnostic: requests keep the periods the tables declare.
+SESSION_OPEN = (9, 0)
+SESSION_MINUTES = 510
+
+
+def _easter(year):
+    """Easter Sunday (anonymous Gregorian algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+
+def exchange_holidays(year):
+    """Euronext closing days: New Year, Good Friday, Easter Monday, Labour Day, Christmas, Boxing Day"""
+    easter = _easter(year)
+    return {
+        date(year, 1, 1), easter - timedelta(days=2), easter + timedelta(days=1),
+        date(year, 5, 1), date(year, 12, 25), date(year, 12, 26)
+    }
+
+
+def is_trading_day(day):
+    return day.weekday() < 5 and day not in exchange_holidays(day.year)
+
+
+def intraday_bars_per_ticker(interval, now):
+    """Bars of the latest session a "1d" intraday request returns at `now`"""
+    minutes = int(interval[:-1])
+    opened = now.replace(hour=SESSION_OPEN[0], minute=SESSION_OPEN[1], second=0, microsecond=0)
+    if is_trading_day(now.date()) and now >= opened:
+        elapsed = min(SESSION_MINUTES, (now - opened).total_seconds() / 60)
+    else:
+        # Before the open or on a closed day: the last full session
+        elapsed = SESSION_MINUTES
+    return math.ceil(elapsed / minutes)
+
+
+class FetchPlanner:
+    """Collects the bars every table needs and merges them into the fewest requests.
+
+    Tables declare (tickers, period, interval) needs. Needs of a ticker on
+    the same interval overlap (the last 2 daily bars are inside the last 11),
+    so only the longest one is requested; the shorter ones are served by
+    trimming its frame. Tickers sharing a merged (period, interval) are then
+    requested together in chunks of `chunk_size`.
+
+    estimated_bars() predicts from the trading calendar what the plan should
+    return, to compare with the bars actually received; it does not size the
+    requests.
+    """
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        # (tickers, period, interval) in the order the tables declared them
+        self.needs = []
+        # (ticker, interval) -> longest period needed
+        self.windows = {}
+
+    def require(self, tickers, period, interval):
+        tickers = list(dict.fromkeys(tickers))
+        self.needs.append((tickers, period, interval))
+        for ticker in tickers:
+            current = self.windows.get((ticker, interval))
+            if current is None or period_to_days(period) > period_to_days(current):
+                self.windows[(ticker, interval)] = period
+
+    def requests(self):
+        """[(period, interval, tickers)] to download, daily intervals first"""
+        groups = {}
+        for (ticker, interval), period in self.windows.items():
+            groups.setdefault((period, interval), []).append(ticker)
+        order = sorted(groups, key=lambda key: (not key[1].endswith("d"), key[1], period_to_days(key[0])))
+        return [(period, interval, groups[(period, interval)]) for period, interval in order]
+
+    def _calls(self, groups):
+        return sum(math.ceil(len(tickers) / self.chunk_size) for tickers in groups)
+
+    def naive_calls(self):
+        """Grouped calls the tables would make on their own"""
+        return self._calls(tickers for tickers, _, _ in self.needs)
+
+    def planned_calls(self):
+        return self._calls(tickers for _, _, tickers in self.requests())
+
+    def estimated_bars(self, now=None):
+        """Bars the planned requests should return, from the trading calendar (a diagnostic)"""
+        now = now or datetime.now()
+        bars = 0
+        for period, interval, tickers in self.requests():
+            if interval.endswith("d"):
+                per_ticker = period_to_days(period)
+            else:
+                per_ticker = period_to_days(period) * intraday_bars_per_ticker(interval, now)
+            bars += per_ticker * len(tickers)
+        return bars
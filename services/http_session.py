@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Keep-alive connections per host: the fetch workers run concurrently and
+# yfinance fetches the tickers of a call in threads
+DEFAULT_POOL_SIZE = 20
+
+# Responses kept for conditional requests
+DEFAULT_VALIDATED_RESPONSES = 256
+
+
+def _counting_pool(pool_class, on_connect):
+    """Subclass of a urllib3 pool calling on_connect() for every new connection"""
+
+    class CountingPool(pool_class):
+        def _new_conn(self):
+            on_connect()
+            return super()._new_conn()
+
+    return CountingPool
+
+
+class PooledAdapter(HTTPAdapter):
+    """Keep-alive transport of the shared session.
+
+    - connections are pooled per host, `pool_size` of them kept open;
+    - GET responses carrying an ETag or Last-Modified header are kept (the
+      last `max_validated` URLs) and asked again with If-None-Match /
+      If-Modified-Since: a 304 answer is served from the kept body;
+    - with `base_url`, every request goes to that scheme and host instead,
+      path and query unchanged, e.g. a local stand-in of the upstream API.
+
+    Requests, new connections and 304 answers are counted in the optional
+    RunStats: connections opened below the number of requests were reused.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, base_url=None, stats=None,
+                 max_validated=DEFAULT_VALIDATED_RESPONSES):
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.stats = stats
+        self.max_validated = max_validated
+        # url -> (validators, status, headers, body, encoding), least recently used first
+        self._validated = OrderedDict()
+        self._lock = threading.Lock()
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    def _count(self, name):
+        if self.stats is not None:
+            self.stats.count(name)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        on_connect = lambda: self._count("http_connections_opened")
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, on_connect),
+            "https": _counting_pool(HTTPSConnectionPool, on_connect)
+        }
+
+    def _route(self, url):
+        if self.base_url is None:
+            return url
+        parts = urlsplit(url)
+        return self.base_url + parts.path + (f"?{parts.query}" if parts.query else "")
+
+    # --------------------------------------------------
+    # CONDITIONAL REQUESTS
+    # --------------------------------------------------
+
+    def _lookup(self, url):
+        with self._lock:
+            entry = self._validated.get(url)
+            if entry is not None:
+                self._validated.move_to_end(url)
+            return entry
+
+    def _keep(self, url, response):
+        validators = {}
+        if "ETag" in response.headers:
+            validators["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        if not validators:
+            return
+        entry = (validators, response.status_code, dict(response.headers), response.content, response.encoding)
+        with self._lock:
+            self._validated[url] = entry
+            self._validated.move_to_end(url)
+            while len(self._validated) > self.max_validated:
+                self._validated.popitem(last=False)
+
+    def _replay(self, entry, request, not_modified):
+        _, status, headers, body, encoding = entry
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "OK"
+        response.headers = requests.structures.CaseInsensitiveDict(headers)
+        response._content = body
+        response.encoding = encoding
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = not_modified.elapsed
+        return response
+
+    def send(self, request, stream=False, **kwargs):
+        request.url = self._route(request.url)
+        entry = self._lookup(request.url) if request.method == "GET" and not stream else None
+        if entry is not None:
+            request.headers.update(entry[0])
+            self._count("http_conditional_requests")
+
+        response = super().send(request, stream=stream, **kwargs)
+        self._count("http_requests")
+
+        if entry is not None and response.status_code == 304:
+            self._count("http_not_modified")
+            # Nobody reads the 304: release its connection to the pool
+            response.close()
+            return self._replay(entry, request, response)
+        if request.method == "GET" and not stream and response.status_code == 200:
+            self._keep(request.url, response)
+        return response
+
+
+def browser_session():
+    """curl_cffi session impersonating Chrome, the kind yfinance builds for every call made without one.
+
+    Kept for a whole run, its keep-alive connections, cookies and crumb serve
+    every call.
+    """
+    from curl_cffi import requests as curl_requests
+
+    return curl_requests.Session(impersonate="chrome")
+
+
+def pooled_session(pool_size=DEFAULT_POOL_SIZE, base_url=None, stats=None):
+    """requests.Session sending everything through one PooledAdapter.
+
+    Unlike browser_session() it does not impersonate a browser: it is the
+    transport for local stand-in servers and connection measurements.
+    """
+    session = requests.Session()
+    adapter = PooledAdapter(pool_size, base_url=base_url, stats=stats)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def connection_reuse(counters):
+    """Share of HTTP requests sent on an already open connection, None before any request"""
+    if not counters.get("http_requests"):
+        return None
+    return max(0.0, 1 - counters.get("http_connections_opened", 0) / counters["http_requests"])
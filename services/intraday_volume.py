@@ -0,0 +1,81 @@
+import numpy as np
+from services.market_data_service import BULK_CHUNK_SIZE
+
+
+class IntradayVolumeTracker:
+    """Running sum of today's intraday volume per ticker.
+
+    The first poll of a session downloads the whole day; later polls only ask
+    for bars from the last one seen. That last bar is requested again
+    because it may still have been forming: its previous volume is swapped
+    for the updated one. Bars from a newer session restart the sum.
+    """
+
+    def __init__(self, provider, engine, interval="1m", chunk_size=BULK_CHUNK_SIZE):
+        self.provider = provider
+        self.engine = engine
+        self.interval = interval
+        self.chunk_size = chunk_size
+        # ticker -> [session date, volume sum, last bar timestamp, last bar volume]
+        self.state = {}
+
+    def _download(self, tickers, start=None):
+        chunks = [tuple(tickers[i:i + self.chunk_size]) for i in range(0, len(tickers), self.chunk_size)]
+        frames = {}
+        for result in self.engine.map(lambda chunk: self.provider.download(list(chunk), "1d", self.interval, start),
+                                      chunks):
+            frames.update(result or {})
+        return frames
+
+    def _accumulate(self, ticker, frame):
+        volumes = np.nan_to_num(frame["Volume"].to_numpy(dtype=float))
+        sessions = frame.index.normalize()
+        state = self.state.get(ticker)
+
+        if state is None:
+            # Whole-day download: sum the latest session at once
+            today = sessions == sessions[-1]
+            self.state[ticker] = [sessions[-1], volumes[today].sum(), frame.index[-1], volumes[-1]]
+            return
+
+        for ts, session, volume in zip(frame.index, sessions, volumes):
+            if session > state[0]:
+                # First bar of a new session
+                state = [session, volume, ts, volume]
+            elif ts == state[2]:
+                # Updated version of the last (possibly partial) bar
+                state[1] += volume - state[3]
+                state[3] = volume
+            elif ts > state[2]:
+                state[1] += volume
+                state[2] = ts
+                state[3] = volume
+
+        self.state[ticker] = state
+
+    def update(self, tickers):
+        """Poll new bars and return today's volume per ticker (NaN when unknown)"""
+        tickers = list(tickers)
+
+        full, incremental = [], {}
+        for ticker in dict.fromkeys(tickers):
+            state = self.state.get(ticker)
+            if state is None:
+                full.append(ticker)
+            else:
+                # Tickers sharing a last bar are polled together
+                incremental.setdefault(state[2], []).append(ticker)
+
+        if full:
+            for ticker, frame in self._download(full).items():
+                if len(frame) > 0:
+                    self._accumulate(ticker, frame)
+        for last, group in incremental.items():
+            for ticker, frame in self._download(group, start=last).items():
+                if len(frame) > 0:
+                    self._accumulate(ticker, frame)
+
+        return np.array([self.state[t][1] if t in self.state else np.nan for t in tickers])
+
+    def reset(self):
+        self.state.clear()
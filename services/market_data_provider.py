@@ -0,0 +1,265 @@
+import ast
+import logging
+import os
+import re
+import threading
+import time
+import warnings
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+from services.http_session import browser_session
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Approximate number of trading sessions per period unit
+PERIOD_UNIT_DAYS = {"d": 1, "wk": 5, "mo": 21, "y": 252}
+
+# yfinance errors of tickers that simply have no bars: retrying does not help
+NO_DATA_ERRORS = ("no data found", "no price data found", "possibly delisted", "no timezone found")
+RATE_LIMIT_ERRORS = ("too many requests", "rate limit")
+
+
+def period_to_days(period):
+    """Convert a yfinance period string ("11d", "3mo", ...) to trading sessions, None for "max" """
+    if period is None or period in ("max", "ytd"):
+        return None
+    for unit in ("wk", "mo", "d", "y"):
+        if period.endswith(unit):
+            return int(period[:-len(unit)]) * PERIOD_UNIT_DAYS[unit]
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def trim_to_period(frame, period, interval):
+    """Keep the bars a yfinance download of `period` would have returned"""
+    days = period_to_days(period)
+    if frame is None or len(frame) == 0 or days is None:
+        return frame
+
+    if interval.endswith("d"):
+        return frame.iloc[-days:]
+
+    # Intraday bars: keep every bar of the last `days` sessions
+    sessions = frame.index.normalize().unique()
+    return frame[frame.index >= sessions[-days:][0]]
+
+
+def synthetic_frame(ticker, interval="1d", bars=260, end=None, seed=0):
+    """Deterministic random-walk OHLCV frame for offline runs"""
+    rng = np.random.default_rng([seed, *ticker.encode()])
+    end = pd.Timestamp(end or pd.Timestamp.today().normalize())
+
+    if interval.endswith("d"):
+        index = pd.bdate_range(end=end, periods=bars)
+    else:
+        # One session of bars from 09:00, ending on `end`
+        minutes = int(interval[:-1])
+        index = pd.date_range(end.normalize() + pd.Timedelta(hours=9), periods=bars, freq=f"{minutes}min")
+
+    close = 10 + rng.uniform(5, 200) * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    spread = close * rng.uniform(0, 0.02, bars)
+    frame = pd.DataFrame({
+        "Open": close + rng.uniform(-1, 1, bars) * spread,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 500_000, bars).astype(float)
+    }, index=index)
+    return frame
+
+
+class MarketDataProvider(ABC):
+    """Source of OHLCV bars used by MarketDataService"""
+
+    @abstractmethod
+    def download(self, tickers, period, interval, start=None):
+        """Return {ticker: DataFrame} with flat OHLCV columns.
+
+        When `start` is given only bars at or after it are requested and
+        `period` is ignored. Tickers for which no bar is available are omitted
+        from the result.
+        """
+
+
+class DownloadError(Exception):
+    """A grouped download failed as a whole (rate limit, network), so it is worth retrying"""
+
+
+class _DownloadErrors(logging.Handler):
+    """Per-ticker errors of a yf.download call.
+
+    yf.download catches the error of every ticker and only logs a summary
+    ("['AI.PA', 'OR.PA']: <error>") from the calling thread; records of
+    concurrent calls made by other threads are ignored.
+    """
+
+    SUMMARY = re.compile(r"^(\[.*?\]): (.*)$", re.S)
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.thread = threading.get_ident()
+        self.errors = {}
+
+    def emit(self, record):
+        if record.thread != self.thread:
+            return
+        match = self.SUMMARY.match(record.getMessage())
+        if match is None:
+            return
+        try:
+            tickers = ast.literal_eval(match.group(1))
+        except (ValueError, SyntaxError):
+            return
+        for ticker in tickers:
+            self.errors[ticker] = match.group(2)
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance through grouped yf.download calls.
+
+    yfinance builds a new HTTP session for every call made without one, so
+    the provider keeps one for all its calls: by default a curl_cffi session
+    impersonating a browser (services.http_session.browser_session), or
+    `session`, e.g. the pooled requests session used with a local stand-in.
+    """
+
+    def __init__(self, timeout=10, session=None, limiter=None):
+        # Seconds yfinance waits for each HTTP response
+        self.timeout = timeout
+        self.session = session if session is not None else browser_session()
+        # Optional TokenBucket charged one token per ticker: yfinance sends one request per ticker
+        self.limiter = limiter
+
+    def _raise_for_errors(self, tickers, errors):
+        """Raise DownloadError when the call failed as a whole rather than for some tickers.
+
+        Rate limiting fails the whole call. So does every ticker erroring,
+        unless all of them merely have no data.
+        """
+        messages = [message.lower() for message in errors.values()]
+        if any(pattern in message for message in messages for pattern in RATE_LIMIT_ERRORS):
+            raise DownloadError(f"rate limited: {next(iter(errors.values()))}")
+        if set(tickers) <= set(errors) and not all(
+            any(pattern in message for pattern in NO_DATA_ERRORS) for message in messages
+        ):
+            raise DownloadError(f"every ticker failed: {next(iter(errors.values()))}")
+
+    def download(self, tickers, period, interval, start=None):
+        import yfinance as yf
+
+        tickers = list(tickers)
+        if self.limiter is not None:
+            self.limiter.acquire(len(tickers))
+
+        window = {"start": start} if start is not None else {"period": period}
+        errors = _DownloadErrors()
+        logger = logging.getLogger("yfinance")
+        logger.addHandler(errors)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                data = yf.download(
+                    tickers,
+                    interval=interval,
+                    group_by="ticker",
+                    progress=False,
+                    timeout=self.timeout,
+                    session=self.session,
+                    **window
+                )
+        finally:
+            logger.removeHandler(errors)
+        self._raise_for_errors(tickers, errors.errors)
+
+        frames = {}
+        if data is None or data.empty:
+            return frames
+
+        for ticker in tickers:
+            try:
+                frame = data[ticker]
+            except KeyError:
+                continue
+
+            # The grouped index is the union of every ticker's dates
+            frame = frame.dropna(how="all")
+            if len(frame) > 0:
+                frames[ticker] = frame
+        return frames
+
+
+class ReplayProvider(MarketDataProvider):
+    """Offline provider serving recorded or synthetic frames.
+
+    Recorded frames are read from `<directory>/<interval>/<ticker>.csv`, as
+    written by RecordingProvider. `latency` seconds are slept on every call to
+    mimic a network round trip. With `as_of`, bars after that day are hidden
+    so the frames look like a download made on that day's close.
+    """
+
+    def __init__(self, directory=None, frames=None, latency=0.0, as_of=None):
+        self.directory = directory
+        self.latency = latency
+        self.as_of = None if as_of is None else pd.Timestamp(as_of).normalize() + pd.Timedelta(days=1)
+        # {(ticker, interval): DataFrame}
+        self.frames = dict(frames or {})
+
+    @classmethod
+    def synthetic(cls, tickers, daily_bars=260, intraday_bars=510, end=None, seed=0, latency=0.0):
+        frames = {}
+        for ticker in tickers:
+            frames[(ticker, "1d")] = synthetic_frame(ticker, "1d", daily_bars, end, seed)
+            for interval in ("1m", "5m", "15m"):
+                bars = intraday_bars // int(interval[:-1])
+                frames[(ticker, interval)] = synthetic_frame(ticker, interval, bars, end, seed)
+        return cls(frames=frames, latency=latency)
+
+    def _load(self, ticker, interval):
+        key = (ticker, interval)
+        if key not in self.frames and self.directory:
+            path = os.path.join(self.directory, interval, f"{ticker}.csv")
+            if os.path.exists(path):
+                self.frames[key] = pd.read_csv(path, index_col=0, parse_dates=True)
+        return self.frames.get(key)
+
+    def download(self, tickers, period, interval, start=None):
+        if self.latency:
+            time.sleep(self.latency)
+
+        frames = {}
+        for ticker in tickers:
+            frame = self._load(ticker, interval)
+            if frame is not None and self.as_of is not None:
+                index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+                frame = frame[index < self.as_of]
+            if frame is not None and start is not None:
+                frame = frame[frame.index >= start]
+            else:
+                frame = trim_to_period(frame, period, interval)
+            if frame is not None and len(frame) > 0:
+                frames[ticker] = frame
+        return frames
+
+
+class RecordingProvider(MarketDataProvider):
+    """Wraps a provider and saves every frame it returns for later replay"""
+
+    def __init__(self, provider, directory):
+        self.provider = provider
+        self.directory = directory
+
+    def download(self, tickers, period, interval, start=None):
+        frames = self.provider.download(tickers, period, interval, start)
+
+        folder = os.path.join(self.directory, interval)
+        os.makedirs(folder, exist_ok=True)
+        for ticker, frame in frames.items():
+            path = os.path.join(folder, f"{ticker}.csv")
+            frame = frame[OHLCV_COLUMNS]
+            if os.path.exists(path):
+                # Keep the longest history recorded for this ticker and interval
+                existing = pd.read_csv(path, index_col=0, parse_dates=True)
+                frame = pd.concat([existing, frame])
+                frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+            frame.to_csv(path)
+        return frames
@@ -1,219 +1,483 @@
-import yfinance as yf
-import pandas as pd
+import time
 import warnings
-from datetime import datetime
+import numpy as np
+import pandas as pd
+from services.market_data_provider import YFinanceProvider, trim_to_period
+from services.fetch_engine import FetchEngine, DeadlineExceeded
+from services.market_matrix import MarketMatrix, top_k
+from services.run_stats import RunStats
+from services.streaming_top_k import Table1Ranker
+from services.defaults import VOLUME_SOURCES, DEFAULT_VOLUME_SOURCE
+from services.fetch_planner import FetchPlanner
+
+# Number of tickers requested per grouped provider call in bulk mode
+BULK_CHUNK_SIZE = 100
+
+# Daily history read by each table (periods are in trading sessions)
+DAILY_PERIOD = "2d"
+VOLUME_PERIOD = "11d"
+# Sessions averaged for the volume multiple (the sessions of VOLUME_PERIOD before today)
+VOLUME_AVERAGE_DAYS = 10
+# For indices, fetch longer history to get at least 2 trading days
+INDEX_PERIOD = "60d"
+# Intraday bars summed for today's volume
+INTRADAY_PERIOD = "1d"
+# Rows of each table 1 ranking
+TABLE_1_ROWS = 5
+
+
+def _multiples(today_volume, average, sessions):
+    """Today's volume over the average volume, 1.0 when either is unknown"""
+    known = ~np.isnan(today_volume) & (sessions >= VOLUME_AVERAGE_DAYS - 1) & (average > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(known, today_volume / average, 1.0)
+
 
 class MarketDataService:
 
-    def __init__(self):
+    def __init__(self, provider=None, bulk=True, chunk_size=BULK_CHUNK_SIZE, engine=None,
+                 volume_source=DEFAULT_VOLUME_SOURCE, intraday_tracker=None, stats=None, failure_store=None,
+                 streaming=False, fallback=None, volume_stats=None, prune_candidates=None):
+        if volume_source not in VOLUME_SOURCES:
+            raise ValueError(f"Unknown volume source: {volume_source}")
+
         self.unavailable_tickers = []
+        # Tickers skipped without any request because the failure store quarantined them
+        self.quarantined_tickers = []
+        self.failure_store = failure_store
+        self.volume_source = volume_source
+        # Optional IntradayVolumeTracker kept across runs to poll only new bars
+        self.intraday_tracker = intraday_tracker
+        self.stats = stats or RunStats()
+        self.stats.info["volume_source"] = volume_source
+        # Name of the table being computed, used to label fetch spans
+        self._table = None
+        self.provider = provider or YFinanceProvider()
+        self.engine = engine or FetchEngine()
+        self.bulk = bulk
+        self.chunk_size = chunk_size
+        # Rank table 1 block by block with bounded heaps instead of over the whole universe
+        self.streaming = streaming
+        # Provider of last known bars for the frames still missing once the engine's deadline has passed
+        self.fallback = fallback
+        # Tickers whose bars came from the fallback, in the order they were needed
+        self.stale_tickers = []
+        # Optional VolumeStatsStore serving the average volumes without downloading VOLUME_PERIOD
+        self.volume_stats = volume_stats
+        if volume_stats is not None and VOLUME_AVERAGE_DAYS not in volume_stats.windows:
+            raise ValueError(f"The volume statistics store must keep a {VOLUME_AVERAGE_DAYS}-session window")
+        # With an intraday volume source, fetch intraday bars only for this many
+        # candidates by daily volume multiple (see _pruned_volume_multiples)
+        self.prune_candidates = prune_candidates if volume_source != "daily" else None
+        self._pruning = {"scanned": 0, "candidates": 0, "max_pruned_estimate": None, "max_ratio": None}
+        # Per-ticker frames split out of grouped downloads, keyed by (ticker, period, interval)
+        self._frames = {}
+
+    # --------------------------------------------------
+    # DOWNLOADS
+    # --------------------------------------------------
+
+    def _download(self, ticker, period, interval):
+        """Return the prefetched frame for ticker, or download it on its own"""
+        key = (ticker, period, interval)
+        if key in self._frames:
+            return self._frames[key]
+
+        return self.provider.download([ticker], period, interval).get(ticker)
+
+    def _prefetch(self, tickers, period, interval):
+        """Fetch every ticker's frame before the table loop reads them.
+
+        In bulk mode tickers are first requested in grouped provider calls,
+        then the ones missing from the grouped result are requested one by
+        one. Every call goes through the fetch engine (concurrent, rate limited,
+        retried). Tickers without data are cached as None so `_download` does
+        not ask for them again.
+        """
+        with self.stats.span(f"{self._table or 'other'}.fetch"):
+            self._fetch(tickers, period, interval)
+
+    def fetched_frames(self):
+        """{(ticker, period, interval): frame} of every frame downloaded so far (None without data)"""
+        return dict(self._frames)
+
+    # --------------------------------------------------
+    # FETCH PLAN
+    # --------------------------------------------------
+
+    def plan(self, list_1, list_2, list_3):
+        """FetchPlanner holding what tables 1-3 will read, quarantined tickers left out"""
+        def tickers(universe):
+            return [
+                item["Ticker"] for item in universe
+                if self.failure_store is None or not self.failure_store.is_quarantined(item["Ticker"])
+            ]
+
+        planner = FetchPlanner(self.chunk_size)
+        planner.require(tickers(list_1), DAILY_PERIOD, "1d")
+        if self.volume_stats is None:
+            planner.require(tickers(list_1), VOLUME_PERIOD, "1d")
+        else:
+            # Tickers already in the store only need their last two sessions
+            planner.require([t for t in tickers(list_1) if not self.volume_stats.tracks(t)],
+                            self.volume_stats.seed_period, "1d")
+        if self.volume_source != "daily" and self.intraday_tracker is None and not self.prune_candidates:
+            planner.require(tickers(list_1), INTRADAY_PERIOD, self.volume_source)
+        planner.require(tickers(list_2), DAILY_PERIOD, "1d")
+        planner.require(tickers(list_3), INDEX_PERIOD, "1d")
+        return planner
+
+    def execute_plan(self, planner):
+        """Download the planned requests, then serve every declared need by trimming their frames"""
+        with self.stats.span("plan.fetch"):
+            for period, interval, tickers in planner.requests():
+                if not interval.endswith("d"):
+                    # Intraday volumes are only read for tickers with daily bars
+                    tickers = [t for t in tickers if self._frames.get((t, planner.windows.get((t, "1d")), "1d")) is not None]
+                self._fetch(tickers, period, interval)
+
+        for tickers, period, interval in planner.needs:
+            for ticker in tickers:
+                key = (ticker, period, interval)
+                merged = (ticker, planner.windows[(ticker, interval)], interval)
+                if key not in self._frames and merged in self._frames:
+                    self._frames[key] = trim_to_period(self._frames[merged], period, interval)
+
+    def deadline_abandoned(self):
+        """Tickers the engine gave up on because its deadline passed, rather than because they failed"""
+        abandoned = set()
+        for item, error in self.engine.errors.items():
+            if isinstance(error, DeadlineExceeded):
+                abandoned.update(item if isinstance(item, tuple) else (item,))
+        return abandoned
+
+    def _evict(self, tickers):
+        """Drop every frame of tickers that are done with"""
+        tickers = set(tickers)
+        for key in [key for key in self._frames if key[0] in tickers]:
+            del self._frames[key]
+
+    def _fetch(self, tickers, period, interval):
+        pending = [t for t in dict.fromkeys(tickers) if (t, period, interval) not in self._frames]
+
+        if self.bulk:
+            chunks = [tuple(pending[i:i + self.chunk_size]) for i in range(0, len(pending), self.chunk_size)]
+            for frames in self.engine.map(lambda chunk: self.provider.download(list(chunk), period, interval), chunks):
+                for ticker, frame in (frames or {}).items():
+                    self._frames[(ticker, period, interval)] = frame
+            pending = [t for t in pending if (t, period, interval) not in self._frames]
+
+        frames = self.engine.map(lambda ticker: self.provider.download([ticker], period, interval).get(ticker), pending)
+        for ticker, frame in zip(pending, frames):
+            self._frames[(ticker, period, interval)] = frame
+
+        if self.fallback is not None and self.engine.expired():
+            missing = [t for t in dict.fromkeys(tickers) if self._frames.get((t, period, interval)) is None]
+            for ticker, frame in (self.fallback.download(missing, period, interval) if missing else {}).items():
+                self._frames[(ticker, period, interval)] = frame
+                if ticker not in self.stale_tickers:
+                    self.stale_tickers.append(ticker)
+
+    # --------------------------------------------------
+    # MATRICES
+    # --------------------------------------------------
+
+    def _matrix(self, tickers, period, interval, bars=None):
+        """Fetch tickers and align their frames into one MarketMatrix"""
+        self._prefetch(tickers, period, interval)
+        frames = [self._download(ticker, period, interval) for ticker in tickers]
+        return MarketMatrix.from_frames(tickers, frames, bars)
+
+    def _mark_unavailable(self, matrix, available):
+        self.unavailable_tickers.extend(t for t, ok in zip(matrix.tickers, available) if not ok)
+
+    def _today_volumes(self, tickers, daily):
+        """Today's volume per ticker from the configured source, NaN when unknown"""
+        if self.volume_source == "daily":
+            # Volume of the latest daily bar
+            return np.where(daily.counts >= 1, daily.volume[:, -1], np.nan)
+
+        if self.intraday_tracker is not None:
+            with self.stats.span(f"{self._table or 'other'}.fetch"):
+                return self.intraday_tracker.update(tickers)
+
+        interval = self.volume_source
+        self._prefetch(tickers, INTRADAY_PERIOD, interval)
+        intraday = [self._download(ticker, INTRADAY_PERIOD, interval) for ticker in tickers]
+
+        # Sum today's intraday volumes (no intraday matrix: only the total is needed)
+        return np.array([
+            np.nansum(f["Volume"].to_numpy(dtype=float)) if f is not None and len(f) > 0 else np.nan
+            for f in intraday
+        ])
+
+    def _average_volumes(self, tickers):
+        """(daily matrix ending today, average volume of the previous sessions, number of those sessions)"""
+        if self.volume_stats is None:
+            daily = self._matrix(tickers, VOLUME_PERIOD, "1d", bars=VOLUME_AVERAGE_DAYS + 1)
+            with warnings.catch_warnings():
+                # Rows without any daily bar would warn about an empty mean
+                warnings.simplefilter("ignore", RuntimeWarning)
+                # Average volume of the last 10 trading days (excluding today)
+                average = np.nanmean(daily.volume[:, :-1], axis=1)
+            return daily, average, daily.counts - 1
+
+        # The previous session of the two bars table 1 reads is added to the
+        # rolling store; only tickers new to it or that missed a session
+        # download a longer history to seed it
+        daily = self._matrix(tickers, DAILY_PERIOD, "1d", bars=2)
+        current = self.volume_stats.observe(tickers, daily.dates[:, -2], daily.volume[:, -2], daily.dates[:, -1])
+        stale = [ticker for ticker, ok in zip(tickers, current) if not ok]
+        if stale:
+            history = self._matrix(stale, self.volume_stats.seed_period, "1d", bars=self.volume_stats.capacity + 1)
+            seeded = np.flatnonzero(history.counts >= 2)
+            self.volume_stats.seed([stale[i] for i in seeded], history.dates[seeded], history.volume[seeded],
+                                   history.counts[seeded])
+            self.stats.count("volume_stats_seeded", len(seeded))
+        self.stats.count("volume_stats_current", int(current.sum()))
+
+        average = self.volume_stats.mean(tickers, VOLUME_AVERAGE_DAYS)
+        return daily, average, self.volume_stats.filled(tickers, VOLUME_AVERAGE_DAYS)
+
+    def _volume_multiples(self, tickers, shown=None):
+        """Today's volume over the 10-day average volume, 1.0 when unknown"""
+        daily, avg_volume_10d, sessions = self._average_volumes(tickers)
+        if self.prune_candidates:
+            return self._pruned_volume_multiples(tickers, shown, daily, avg_volume_10d, sessions)
+        return _multiples(self._today_volumes(tickers, daily), avg_volume_10d, sessions)
+
+    def _pruned_volume_multiples(self, tickers, shown, daily, average, sessions):
+        """Volume multiples with intraday volumes fetched for the candidates only.
+
+        Every ticker is first scored with its daily bar volume, already
+        downloaded. Intraday bars are then fetched for the prune_candidates
+        best estimates plus the `shown` rows (the best and worst performers,
+        whose rows are kept whole). The other tickers get NaN, so they never
+        enter the most active ranking; their estimates are kept to tell
+        whether one of them could have (see pruning_report).
+        """
+        estimate = _multiples(np.where(daily.counts >= 1, daily.volume[:, -1], np.nan), average, sessions)
+        candidates = np.zeros(len(tickers), dtype=bool)
+        candidates[top_k(estimate, self.prune_candidates)] = True
+        if shown is not None:
+            candidates[shown] = True
 
-    def _get_daily_data(self, ticker):
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            data = yf.download(ticker, period="2d", interval="1d", progress=False)
-        
-        if data is None or len(data) < 2:
-            self.unavailable_tickers.append(ticker)
-            return None
-        return data.iloc[-2], data.iloc[-1]
-
-    def _get_daily_data_single_row(self, ticker):
-        """Get daily data, accepting single row (for indices like EURO STOXX)"""
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            # For indices, fetch longer history to get at least 2 trading days
-            data = yf.download(ticker, period="60d", interval="1d", progress=False)
-        
-        if data is None or len(data) < 1:
-            self.unavailable_tickers.append(ticker)
-            return None
-        
-        # If we got 2+ rows, return previous and current
-        if len(data) >= 2:
-            return data.iloc[-2], data.iloc[-1]
-        
-        # If only 1 row (common for indices), return it with itself as fallback
-        # The calling code will detect this and use Open vs Close instead
-        return data.iloc[-1], data.iloc[-1]
-
-    def _get_intraday_and_avg_volume(self, ticker):
-        """Get today's intraday volume sum and 10-day average volume"""
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            # Get 1-minute intraday data for today
-            intraday = yf.download(ticker, period="1d", interval="1m", progress=False)
-            
-            # Get last 10 days of daily data for average volume
-            daily = yf.download(ticker, period="11d", interval="1d", progress=False)
-        
-        if intraday is None or len(intraday) == 0:
-            return None, None
-        
-        if daily is None or len(daily) < 10:
-            return None, None
-        
+        rows = np.flatnonzero(candidates)
+        multiples = np.full(len(tickers), np.nan)
+        multiples[rows] = _multiples(self._today_volumes([tickers[i] for i in rows], daily), average[rows], sessions[rows])
+
+        evidence = self._pruning
+        evidence["scanned"] += len(tickers)
+        evidence["candidates"] += len(rows)
+        if (~candidates).any():
+            evidence["max_pruned_estimate"] = max(evidence["max_pruned_estimate"] or 0.0, float(estimate[~candidates].max()))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = multiples[rows] / estimate[rows]
+        ratios = ratios[np.isfinite(ratios)]
+        if len(ratios):
+            evidence["max_ratio"] = max(evidence["max_ratio"] or 0.0, float(ratios.max()))
+        return multiples
+
+    def pruning_report(self, most_active):
+        """Whether the most active ranking of a pruned run could differ from a full scan.
+
+        A pruned ticker's intraday multiple is bounded by its daily estimate
+        times the largest intraday/daily ratio seen on the candidates, and by
+        1.0, the multiple of tickers without intraday volume. The ranking is
+        exact when that bound stays below the last multiple shown. The ratio
+        is observed, not guaranteed, so "exact" holds as long as pruned
+        tickers trade like the candidates did.
+        """
+        evidence = dict(self._pruning)
+        pruned = evidence["scanned"] - evidence["candidates"]
+        bound = None
+        if pruned:
+            bound = 1.0
+            if evidence["max_ratio"] is not None:
+                bound = max(bound, evidence["max_pruned_estimate"] * evidence["max_ratio"])
+        last_shown = float(most_active["volume_multiple"].iloc[-1]) if len(most_active) else None
+
+        if not pruned:
+            exact = True
+        elif evidence["max_ratio"] is None or len(most_active) < TABLE_1_ROWS:
+            exact = False
+        else:
+            exact = bound < last_shown
+        return {**evidence, "pruned": pruned, "bound": bound, "last_shown": last_shown, "exact": exact}
+
+    def _rows(self, matrix, available, close, variation, defined):
+        return [
+            {
+                "ticker": matrix.tickers[i],
+                "close": float(close[i]),
+                "variation": float(variation[i]) if defined[i] else None
+            }
+            for i in np.flatnonzero(available)
+        ]
+
+    # --------------------------------------------------
+    # TABLES
+    # --------------------------------------------------
+
+    def _instrumented(self, table, compute, universe):
+        """Run compute(universe), splitting its time into "<table>.fetch" and "<table>.compute" spans"""
+        self._table = table
+        fetched = self.stats.spans[f"{table}.fetch"]
+        started = time.perf_counter()
         try:
-            # Get volume column (handle both single and multi-index columns)
-            intraday_volume = intraday["Volume"] if "Volume" in intraday.columns else intraday[("Volume", ticker)]
-            daily_volume = daily["Volume"] if "Volume" in daily.columns else daily[("Volume", ticker)]
-            
-            # Sum today's intraday volume
-            today_volume = intraday_volume.sum().item()
-            
-            # Calculate average volume for the last 10 trading days (excluding today)
-            avg_volume_10d = daily_volume.iloc[:-1].tail(10).mean().item()
-            
-            return today_volume, avg_volume_10d
-        except (KeyError, TypeError):
-            return None, None
-
-    def compute_table_1(self, universe):
-        rows = []
-
-        for item in universe:
-            data = self._get_daily_data(item["Ticker"])
-            if data is None:
-                continue
-            prev, curr = data
-
-            # Convert Series to scalars (handle both single and multi-index columns)
-            try:
-                close_curr = float(curr["Close"].item() if hasattr(curr["Close"], 'item') else curr["Close"])
-                close_prev = float(prev["Close"].item() if hasattr(prev["Close"], 'item') else prev["Close"])
-            except (KeyError, TypeError):
-                try:
-                    close_curr = float(curr[("Close", item["Ticker"])].item())
-                    close_prev = float(prev[("Close", item["Ticker"])].item())
-                except (KeyError, TypeError):
-                    continue
-            
+            return compute(universe)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats.add_span(f"{table}.compute", elapsed - (self.stats.spans[f"{table}.fetch"] - fetched))
+            self._table = None
+
+    def _run_table(self, table, compute, universe):
+        """Compute a table, skipping quarantined tickers and recording fetch outcomes"""
+        if self.failure_store is None:
+            result = self._instrumented(table, compute, universe)
+        else:
+            universe, quarantined = self.failure_store.admit(universe)
+            self.quarantined_tickers.extend(quarantined)
+
+            failed_before = len(self.unavailable_tickers)
+            result = self._instrumented(table, compute, universe)
+            self.failure_store.record_table(universe, self.unavailable_tickers[failed_before:],
+                                            self.deadline_abandoned())
+
+        if self.volume_stats is not None and self.volume_stats.dirty:
+            self.volume_stats.save()
+        return result
+
+    def compute_table_1(self, universe, on_snapshot=None):
+        """In streaming mode on_snapshot(tables, processed) gets the rankings after every block"""
+        if self.streaming:
+            result = self._run_table("table_1", lambda items: self._stream_table_1(items, on_snapshot), universe)
+        else:
+            result = self._run_table("table_1", self._compute_table_1, universe)
+        if self.prune_candidates:
+            self.stats.info["pruning"] = self.pruning_report(result["most_active"])
+        return result
+
+    def compute_table_1_partial(self, universe, offset=0):
+        """Table 1 rankings of the part of a larger universe starting at `offset`,
+        as a Table1Ranker to merge with the other parts"""
+        ranker = Table1Ranker()
+        self._run_table("table_1", lambda items: self._rank_table_1(items, ranker, offset), universe)
+        return ranker
+
+    def compute_table_2(self, universe):
+        return self._run_table("table_2", self._compute_simple_table, universe)
+
+    def compute_table_3(self, universe):
+        return self._run_table("table_3", self._compute_table_3, universe)
+
+    def _table_1_columns(self, universe):
+        """Rows of universe with two daily bars, with their variation, close multiple and volume multiple"""
+        tickers = [item["Ticker"] for item in universe]
+        daily = self._matrix(tickers, DAILY_PERIOD, "1d", bars=2)
+
+        available = daily.counts >= 2
+        self._mark_unavailable(daily, available)
+
+        rows = np.flatnonzero(available)
+        if len(rows) == 0:
+            return rows, None, None, None
+
+        close_prev, close_curr = daily.close[rows, -2], daily.close[rows, -1]
+        with np.errstate(divide="ignore", invalid="ignore"):
             variation = (close_curr - close_prev) / close_prev
             multiple = close_curr / close_prev
-            
-            # Get intraday volume and 10-day average
-            today_volume, avg_volume_10d = self._get_intraday_and_avg_volume(item["Ticker"])
-            
-            if today_volume is None or avg_volume_10d is None:
-                volume_multiple = 1.0
-            else:
-                volume_multiple = today_volume / avg_volume_10d if avg_volume_10d > 0 else 1.0
-
-            rows.append({
-                "name": item["Name"],
-                "variation": variation,
-                "multiple": multiple,
-                "volume_multiple": volume_multiple
-            })
-
-        if not rows:
+
+        # Rows that can reach the best or worst rankings
+        shown = np.union1d(top_k(variation, TABLE_1_ROWS), top_k(variation, TABLE_1_ROWS, largest=False))
+        volume_multiple = self._volume_multiples([tickers[i] for i in rows], shown)
+        return rows, variation, multiple, volume_multiple
+
+    def _compute_table_1(self, universe):
+        rows, variation, multiple, volume_multiple = self._table_1_columns(universe)
+
+        if len(rows) == 0:
             return {
                 "most_active": pd.DataFrame(),
                 "best": pd.DataFrame(),
                 "worst": pd.DataFrame()
             }
 
-        df = pd.DataFrame(rows)
-        df = df.reset_index(drop=True)
-
-        most_active = df.nlargest(5, "volume_multiple")
-        best = df.nlargest(5, "variation")
-        worst = df.nsmallest(5, "variation")
+        # Indexed by position in the universe, like the streaming and sharded rankings
+        df = pd.DataFrame({
+            "name": [universe[i]["Name"] for i in rows],
+            "variation": variation,
+            "multiple": multiple,
+            "volume_multiple": volume_multiple
+        }, index=rows)
 
         return {
-            "most_active": most_active,
-            "best": best,
-            "worst": worst
+            "most_active": df.iloc[top_k(volume_multiple, TABLE_1_ROWS)],
+            "best": df.iloc[top_k(variation, TABLE_1_ROWS)],
+            "worst": df.iloc[top_k(variation, TABLE_1_ROWS, largest=False)]
         }
 
-    def compute_table_2(self, universe):
-        return self._compute_simple_table(universe)
+    def _stream_table_1(self, universe, on_snapshot=None):
+        ranker = Table1Ranker()
+        self._rank_table_1(universe, ranker, on_snapshot=on_snapshot)
+        return ranker.snapshot()
 
-    def compute_table_3(self, universe):
-        results = []
-
-        for item in universe:
-            ticker = item["Ticker"]
-            data = self._get_daily_data_single_row(ticker)
-            if data is None:
-                continue
-            prev, curr = data
-
-            try:
-                close = curr["Close"].item() if hasattr(curr["Close"], 'item') else float(curr["Close"])
-                prev_close = prev["Close"].item() if hasattr(prev["Close"], 'item') else float(prev["Close"])
-            except (KeyError, TypeError):
-                try:
-                    close = float(curr[("Close", ticker)].item())
-                    prev_close = float(prev[("Close", ticker)].item())
-                except (KeyError, TypeError):
-                    continue
-            
-            if close == prev_close:
-                # If same close, calculate intra-day variation (Open vs Close)
-                try:
-                    open_price = curr["Open"].item() if hasattr(curr["Open"], 'item') else float(curr["Open"])
-                except (KeyError, TypeError):
-                    try:
-                        open_price = float(curr[("Open", ticker)].item())
-                    except (KeyError, TypeError):
-                        variation = None
-                    else:
-                        if open_price != 0 and open_price != close:
-                            variation = (close - open_price) / open_price
-                        else:
-                            variation = None
-                else:
-                    if open_price != 0 and open_price != close:
-                        variation = (close - open_price) / open_price
-                    else:
-                        variation = None
-            else:
-                if prev_close != 0:
-                    variation = (close - prev_close) / prev_close
-                else:
-                    variation = None
-
-            results.append({
-                "ticker": ticker,
-                "close": close,
-                "variation": variation
-            })
-
-        return results
+    def _rank_table_1(self, universe, ranker, offset=0, on_snapshot=None):
+        """Push table 1 rows into ranker block by block.
+
+        Each block holds enough tickers to keep every fetch worker busy. Its
+        rows are pushed into bounded heaps and its frames evicted, so memory
+        no longer grows with the universe; the rankings equal the full scan.
+        Rows are ranked at offset + their position in universe.
+        """
+        block = self.chunk_size * self.engine.workers
+
+        for start in range(0, len(universe), block):
+            items = universe[start:start + block]
+            rows, variation, multiple, volume_multiple = self._table_1_columns(items)
+            for j, i in enumerate(rows):
+                ranker.push(offset + start + i, items[i]["Name"], float(variation[j]), float(multiple[j]),
+                            float(volume_multiple[j]))
+            self._evict(item["Ticker"] for item in items)
+
+            if on_snapshot is not None:
+                on_snapshot(ranker.snapshot(), start + len(items))
+
+    def _compute_table_3(self, universe):
+        tickers = [item["Ticker"] for item in universe]
+        daily = self._matrix(tickers, INDEX_PERIOD, "1d", bars=2)
+
+        # Single bars are accepted (common for indices like EURO STOXX)
+        available = daily.counts >= 1
+        self._mark_unavailable(daily, available)
+
+        close = daily.close[:, -1]
+        open_price = daily.open[:, -1]
+        # With only one bar, the bar is its own previous close
+        prev_close = np.where(daily.counts >= 2, daily.close[:, -2], close)
+
+        # If same close, calculate intra-day variation (Open vs Close)
+        same_close = close == prev_close
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variation = np.where(
+                same_close,
+                (close - open_price) / open_price,
+                (close - prev_close) / prev_close
+            )
+        defined = np.where(same_close, (open_price != 0) & (open_price != close), prev_close != 0)
+
+        return self._rows(daily, available, close, variation, defined)
 
     def _compute_simple_table(self, universe):
-        results = []
-
-        for item in universe:
-            ticker = item["Ticker"]
-            data = self._get_daily_data(ticker)
-            if data is None:
-                continue
-            prev, curr = data
-
-            try:
-                close = curr["Close"].item() if hasattr(curr["Close"], 'item') else float(curr["Close"])
-                prev_close = prev["Close"].item() if hasattr(prev["Close"], 'item') else float(prev["Close"])
-            except (KeyError, TypeError):
-                try:
-                    close = float(curr[("Close", ticker)].item())
-                    prev_close = float(prev[("Close", ticker)].item())
-                except (KeyError, TypeError):
-                    continue
-            
-            if close == prev_close:
-                variation = None
-            else:
-                if prev_close != 0:
-                    variation = (close - prev_close) / prev_close
-                else:
-                    variation = None
-
-            results.append({
-                "ticker": ticker,
-                "close": close,
-                "variation": variation
-            })
-
-        return results
\ No newline at end of file
+        tickers = [item["Ticker"] for item in universe]
+        daily = self._matrix(tickers, DAILY_PERIOD, "1d", bars=2)
+
+        available = daily.counts >= 2
+        self._mark_unavailable(daily, available)
+
+        close, prev_close = daily.close[:, -1], daily.close[:, -2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variation = (close - prev_close) / prev_close
+        defined = (close != prev_close) & (prev_close != 0)
+
+        return self._rows(daily, available, close, variation, defined)
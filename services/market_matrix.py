@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+
+def _column(frame, name):
+    """Column values as float, whether columns are flat or (Price, Ticker)"""
+    values = frame[name]
+    if isinstance(values, pd.DataFrame):
+        values = values.iloc[:, 0]
+    return values.to_numpy(dtype=float)
+
+
+def top_k(values, k, largest=True):
+    """Indices of the k largest (or smallest) values.
+
+    Ordered like DataFrame.nlargest/nsmallest with keep="first": ties go to
+    the lowest index and NaN values are skipped. np.argpartition selects the
+    candidates so only k values (plus boundary ties) are sorted.
+    """
+    keys = -values if largest else values
+    candidates = np.flatnonzero(~np.isnan(keys))
+    if len(candidates) > k:
+        kth = np.argpartition(keys[candidates], k - 1)[:k]
+        threshold = keys[candidates][kth].max()
+        candidates = candidates[keys[candidates] <= threshold]
+    order = np.lexsort((candidates, keys[candidates]))
+    return candidates[order][:k]
+
+
+class MarketMatrix:
+    """Provider frames aligned into (tickers x bars) NumPy arrays.
+
+    Bars are right-aligned per ticker: column -1 holds each ticker's latest
+    bar, column -2 the one before, and so on. Exchanges do not share a
+    calendar, so aligning on the last sessions rather than on dates matches
+    what the per-ticker iloc[-2]/iloc[-1] lookups used to read. Shorter
+    histories are NaN-padded on the left and `counts` holds the number of
+    real bars of each row.
+    """
+
+    def __init__(self, tickers, dates, open, close, volume, counts):
+        self.tickers = tickers
+        self.dates = dates
+        self.open = open
+        self.close = close
+        self.volume = volume
+        self.counts = counts
+
+    @classmethod
+    def from_frames(cls, tickers, frames, bars=None):
+        """Build the matrix from frames listed in the same order as tickers"""
+        lengths = np.array([0 if f is None else len(f) for f in frames], dtype=int)
+        width = bars or int(lengths.max(initial=0))
+        shape = (len(tickers), width)
+
+        dates = np.full(shape, np.datetime64("NaT"), dtype="datetime64[ns]")
+        open = np.full(shape, np.nan)
+        close = np.full(shape, np.nan)
+        volume = np.full(shape, np.nan)
+
+        for row, frame in enumerate(frames):
+            if frame is None or len(frame) == 0 or width == 0:
+                continue
+            tail = frame.iloc[-width:]
+            start = width - len(tail)
+            index = pd.DatetimeIndex(tail.index)
+            dates[row, start:] = (index.tz_localize(None) if index.tz is not None else index).to_numpy()
+            open[row, start:] = _column(tail, "Open")
+            close[row, start:] = _column(tail, "Close")
+            volume[row, start:] = _column(tail, "Volume")
+
+        return cls(list(tickers), dates, open, close, volume, np.minimum(lengths, width))
+
+    def __len__(self):
+        return len(self.tickers)
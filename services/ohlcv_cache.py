@@ -0,0 +1,247 @@
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from services.market_data_provider import MarketDataProvider, OHLCV_COLUMNS, period_to_days, trim_to_period
+from services.defaults import DEFAULT_CACHE_PATH, DEFAULT_TTL
+
+# Intraday bars older than this are dropped (Yahoo serves 1m bars for 7 days only)
+INTRADAY_RETENTION_DAYS = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, interval, ts)
+);
+CREATE TABLE IF NOT EXISTS series (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    tz TEXT,
+    days INTEGER,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (ticker, interval)
+);
+"""
+
+
+class OHLCVCache:
+    """On-disk SQLite store of OHLCV bars keyed by ticker and interval.
+
+    Timestamps are stored as UTC nanoseconds together with the series
+    timezone so intraday frames come back exactly as the provider returned
+    them. `days` is the longest lookback (in sessions) fetched in full for the
+    series, which tells whether the cache covers a requested period.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Providers may be called from worker threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    # --------------------------------------------------
+    # SERIES METADATA
+    # --------------------------------------------------
+
+    def series_info(self, ticker, interval):
+        """Return (tz, days, fetched_at) for a cached series, or None"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT tz, days, fetched_at FROM series WHERE ticker = ? AND interval = ?",
+                (ticker, interval)
+            ).fetchone()
+
+    def is_fresh(self, ticker, interval, now=None):
+        info = self.series_info(ticker, interval)
+        return info is not None and (now or time.time()) - info[2] < self.ttl
+
+    def last_timestamp(self, ticker, interval):
+        info = self.series_info(ticker, interval)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MAX(ts) FROM bars WHERE ticker = ? AND interval = ?",
+                (ticker, interval)
+            ).fetchone()
+        if info is None or row[0] is None:
+            return None
+        return self._to_index([row[0]], info[0])[0]
+
+    # --------------------------------------------------
+    # BARS
+    # --------------------------------------------------
+
+    def load(self, ticker, interval):
+        info = self.series_info(ticker, interval)
+        if info is None:
+            return None
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT ts, open, high, low, close, volume FROM bars "
+                "WHERE ticker = ? AND interval = ? ORDER BY ts",
+                (ticker, interval)
+            ).fetchall()
+
+        frame = pd.DataFrame(rows, columns=["ts"] + OHLCV_COLUMNS, dtype=float)
+        frame.index = self._to_index(frame.pop("ts").astype("int64"), info[0])
+        return frame
+
+    def store(self, ticker, interval, frame, days=None, fetched_at=None):
+        """Upsert bars and mark the series as fetched now.
+
+        `days` extends the covered lookback when the frame came from a full
+        period download; incremental appends leave it unchanged.
+        """
+        index = pd.DatetimeIndex(frame.index)
+        tz = str(index.tz) if index.tz is not None else None
+        stamps = (index.tz_convert("UTC") if tz else index).as_unit("ns").asi8
+        values = frame.reindex(columns=OHLCV_COLUMNS).astype(float)
+        rows = [
+            (ticker, interval, int(ts), *[None if pd.isna(v) else v for v in bar])
+            for ts, bar in zip(stamps, values.itertuples(index=False))
+        ]
+
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.execute(
+                "INSERT INTO series VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (ticker, interval) DO UPDATE SET "
+                "tz = excluded.tz, days = MAX(COALESCE(days, 0), COALESCE(excluded.days, 0)), "
+                "fetched_at = excluded.fetched_at",
+                (ticker, interval, tz, days, fetched_at or time.time())
+            )
+
+    def invalidate(self, tickers=None, interval=None):
+        """Drop cached series, optionally restricted to some tickers and/or one interval"""
+        clauses, params = [], []
+        if tickers is not None:
+            tickers = list(tickers)
+            clauses.append(f"ticker IN ({', '.join('?' * len(tickers))})")
+            params.extend(tickers)
+        if interval is not None:
+            clauses.append("interval = ?")
+            params.append(interval)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock, self._db:
+            self._db.execute(f"DELETE FROM bars{where}", params)
+            self._db.execute(f"DELETE FROM series{where}", params)
+
+    def prune(self, interval, before):
+        """Drop bars of `interval` older than the `before` timestamp"""
+        stamp = pd.Timestamp(before)
+        stamp = stamp.tz_convert("UTC") if stamp.tz is not None else stamp
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM bars WHERE interval = ? AND ts < ?",
+                (interval, int(stamp.as_unit("ns").value))
+            )
+
+    def _to_index(self, stamps, tz):
+        index = pd.to_datetime(pd.Series(stamps).astype("int64"), unit="ns")
+        index = pd.DatetimeIndex(index)
+        return index.tz_localize("UTC").tz_convert(tz) if tz else index
+
+
+class StaleCacheProvider(MarketDataProvider):
+    """Serves the cached bars however old they are, without any request.
+
+    Used as the fallback of deadline runs: the last known bars of tickers
+    that could not be downloaded in time.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def download(self, tickers, period, interval, start=None):
+        result = {}
+        for ticker in tickers:
+            frame = self.cache.load(ticker, interval)
+            if frame is not None and start is not None:
+                frame = frame[frame.index >= start]
+            else:
+                frame = trim_to_period(frame, period, interval)
+            if frame is not None and len(frame) > 0:
+                result[ticker] = frame
+        return result
+
+
+class CachingProvider(MarketDataProvider):
+    """Serves frames from an OHLCVCache and only downloads the missing bars.
+
+    - series fetched less than `cache.ttl` seconds ago are served as is;
+    - series covering the requested period are refreshed from their last
+      cached bar (re-downloaded because it may have been partial);
+    - anything else is downloaded in full and stored.
+
+    A ticker whose refresh or download comes back empty is left out of the
+    result, like with the wrapped provider: its old bars would pass for
+    today's. Serving cached bars whatever their age is StaleCacheProvider's job.
+    """
+
+    def __init__(self, provider, cache):
+        self.provider = provider
+        self.cache = cache
+
+    def download(self, tickers, period, interval, start=None):
+        if start is not None:
+            return self.provider.download(tickers, period, interval, start)
+
+        days = period_to_days(period)
+        now = time.time()
+        window_start = None
+        if days is not None:
+            window_start = pd.Timestamp.today().normalize() - pd.offsets.BDay(days)
+
+        full, incremental = [], {}
+        # Tickers fresh in the cache or refreshed by this call
+        served = set()
+        for ticker in tickers:
+            info = self.cache.series_info(ticker, interval)
+            if info is None or (days is not None and (info[1] or 0) < days):
+                full.append(ticker)
+            elif now - info[2] < self.cache.ttl:
+                served.add(ticker)
+            else:
+                last = self.cache.last_timestamp(ticker, interval)
+                if last is None or (window_start is not None and last.tz_localize(None) < window_start):
+                    full.append(ticker)
+                else:
+                    # Group tickers sharing a last bar so they are refreshed together
+                    incremental.setdefault(last, []).append(ticker)
+
+        if full:
+            frames = self.provider.download(full, period, interval)
+            for ticker, frame in frames.items():
+                self.cache.store(ticker, interval, frame, days=days, fetched_at=now)
+                served.add(ticker)
+
+        for last, group in incremental.items():
+            frames = self.provider.download(group, period, interval, start=last)
+            for ticker in group:
+                if ticker in frames:
+                    self.cache.store(ticker, interval, frames[ticker], fetched_at=now)
+                    served.add(ticker)
+
+        if not interval.endswith(("d", "wk", "mo")) and (full or incremental):
+            self.cache.prune(interval, pd.Timestamp.today() - pd.Timedelta(days=INTRADAY_RETENTION_DAYS))
+
+        result = {}
+        for ticker in tickers:
+            if ticker not in served:
+                continue
+            frame = trim_to_period(self.cache.load(ticker, interval), period, interval)
+            if frame is not None and len(frame) > 0:
+                result[ticker] = frame
+        return result
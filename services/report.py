@@ -0,0 +1,130 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from services.word_service import WordService, date_values, table_1_values, market_table_values
+from services.compiled_template import load_compiled_template
+from services.run_stats import RunStats
+
+
+def format_display_date(date):
+    display_date = date.strftime("%B %d, %Y").replace(" 0", " ")
+    display_date = display_date.replace("1,", "1st,").replace("2,", "2nd,").replace("3,", "3rd,")
+    display_date = display_date.replace("21,", "21st,").replace("22,", "22nd,").replace("23,", "23rd,")
+    display_date = display_date.replace("31,", "31st,")
+    return display_date
+
+
+def report_path(output_dir, date):
+    return f"{output_dir}/{date.strftime('%Y-%m-%d')} daily closing.docx"
+
+
+def open_template(template_path, compiled=False):
+    """Return a document exposing replace_date / fill_table_* / save"""
+    if compiled:
+        return load_compiled_template(template_path).new_document()
+    return WordService(template_path)
+
+
+def expected_placeholders(table_2_rows, table_3_rows):
+    """Every placeholder a report writes when all of its rows are available"""
+    row = {"name": "", "variation": 0.0, "multiple": 1.0, "volume_multiple": 1.0}
+    frame = pd.DataFrame([row] * 5)
+    market_row = {"ticker": "", "close": 0.0, "variation": None}
+    return [
+        *date_values(""),
+        *table_1_values({"most_active": frame, "best": frame, "worst": frame}),
+        *market_table_values([market_row] * table_2_rows, table_num=2, start_mvt_index=1),
+        *market_table_values([market_row] * table_3_rows, table_num=3, start_mvt_index=10)
+    ]
+
+
+# Placeholders of the two cells of row i (from 1) of each table 1 category
+TABLE_1_CELLS = {
+    "most_active": ("{{{{MOST ACTIVE STOCK {}}}}}", "{{{{MAS MULTIPLE {}}}}}"),
+    "best": ("{{{{BEST PERFORMER {}}}}}", "{{{{INCREASE {}}}}}"),
+    "worst": ("{{{{WORST PERFORMER {}}}}}", "{{{{DECREASE {}}}}}")
+}
+
+
+def degraded_cells(tables, list_1, stale_tickers):
+    """{placeholder: ticker} of every cell written from stale bars"""
+    table1_data, table2_data, table3_data = tables
+    stale = set(stale_tickers)
+    cells = {}
+
+    # Table 1 rows carry the company name only
+    stale_names = {item["Name"]: item["Ticker"] for item in list_1 if item["Ticker"] in stale}
+    for category, formats in TABLE_1_CELLS.items():
+        for i, name in enumerate(table1_data[category]["name"] if len(table1_data[category]) else []):
+            if name in stale_names:
+                cells.update({cell.format(i + 1): stale_names[name] for cell in formats})
+
+    for rows, table_num, start_mvt_index in ((table2_data, 2, 1), (table3_data, 3, 10)):
+        placeholders = list(market_table_values(rows, table_num=table_num, start_mvt_index=start_mvt_index))
+        for i, row in enumerate(rows):
+            if row["ticker"] in stale:
+                # Two cells per row: price then variation
+                cells.update({cell: row["ticker"] for cell in placeholders[2 * i:2 * i + 2]})
+    return cells
+
+
+def validate_template(template_path, table_2_rows, table_3_rows):
+    """Return (found, missing, unknown): the template's placeholders, those the
+    report writes but the template lacks, and those nothing ever fills"""
+    found = WordService(template_path).placeholders()
+    expected = expected_placeholders(table_2_rows, table_3_rows)
+    missing = [placeholder for placeholder in expected if placeholder not in found]
+    unknown = [placeholder for placeholder in found if placeholder not in expected]
+    return found, missing, unknown
+
+
+def render_report(template_path, output_file, date, tables, compiled=False, stats=None):
+    """Fill the template with the (table 1, table 2, table 3) results and save it"""
+    table1_data, table2_data, table3_data = tables
+    stats = stats or RunStats()
+
+    with stats.span("render.load"):
+        word_service = open_template(template_path, compiled)
+        word_service.replace_date(format_display_date(date))
+    with stats.span("table_1.render"):
+        word_service.fill_table_1(table1_data)
+    with stats.span("table_2.render"):
+        word_service.fill_table_2(table2_data)
+    with stats.span("table_3.render"):
+        word_service.fill_table_3(table3_data)
+    with stats.span("render.save"):
+        word_service.save(output_file)
+    return output_file
+
+
+def _render_variant(template_path, output_file, date, tables, compiled):
+    started = time.perf_counter()
+    render_report(template_path, output_file, date, tables, compiled)
+    return time.perf_counter() - started
+
+
+def render_variants(variants, date, tables, compiled=False, workers=None):
+    """Render the same tables into every (template, output) pair in worker processes.
+
+    Returns one entry per pair, in order, with the render time measured in its
+    worker or the error that stopped it: a failing template does not prevent
+    the other documents from being written.
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for template_path, output_file in variants:
+            if os.path.dirname(output_file):
+                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            futures.append(executor.submit(_render_variant, template_path, output_file, date, tables, compiled))
+
+        for (template_path, output_file), future in zip(variants, futures):
+            result = {"template": template_path, "output": output_file, "seconds": None, "error": None}
+            try:
+                result["seconds"] = round(future.result(), 4)
+            except Exception as error:
+                result["error"] = "".join(traceback.format_exception_only(type(error), error)).strip()
+            results.append(result)
+    return results
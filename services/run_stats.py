@@ -0,0 +1,150 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from services.market_data_provider import MarketDataProvider
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, None where it cannot be read"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RunStats:
+    """Timings and counters of one run, exported as JSON or a Prometheus textfile.
+
+    - spans: seconds per named phase ("table_1.fetch", "table_1.render", ...),
+      summed when a phase is entered several times;
+    - counters: network calls, retries, timeouts, ...;
+    - fetches: one entry per ticker and provider call with the call latency,
+      the number of tickers sharing the call, the bars and the in-memory size
+      of the returned frame.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.spans = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.fetches = []
+        self.info = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - started)
+
+    def add_span(self, name, seconds):
+        with self._lock:
+            self.spans[name] += seconds
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def record_fetch(self, tickers, period, interval, seconds, frames):
+        entries = []
+        for ticker in tickers:
+            frame = frames.get(ticker)
+            entries.append({
+                "ticker": ticker,
+                "interval": interval,
+                "period": period,
+                "seconds": round(seconds, 4),
+                "batch_size": len(tickers),
+                "bars": 0 if frame is None else len(frame),
+                "payload_bytes": 0 if frame is None else int(frame.memory_usage(index=True).sum())
+            })
+        with self._lock:
+            self.fetches.extend(entries)
+            self.counters["network_calls"] += 1
+            self.counters["tickers_requested"] += len(tickers)
+
+    def merge(self, report):
+        """Add the spans, counters and fetches of another run's to_dict() report"""
+        with self._lock:
+            for name, seconds in report["spans"].items():
+                self.spans[name] += seconds
+            for name, value in report["counters"].items():
+                self.counters[name] += value
+            self.fetches.extend(report["fetches"])
+
+    # --------------------------------------------------
+    # EXPORT
+    # --------------------------------------------------
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "duration_seconds": round((datetime.now() - self.started_at).total_seconds(), 3),
+                "peak_rss_bytes": peak_rss_bytes(),
+                "info": dict(self.info),
+                "spans": {name: round(seconds, 4) for name, seconds in self.spans.items()},
+                "counters": dict(self.counters),
+                "payload_bytes": sum(entry["payload_bytes"] for entry in self.fetches),
+                "fetches": list(self.fetches)
+            }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+    def write_prometheus(self, path, prefix="closing_report"):
+        """Write metrics in the node_exporter textfile collector format"""
+        report = self.to_dict()
+        lines = [
+            f"# TYPE {prefix}_duration_seconds gauge",
+            f"{prefix}_duration_seconds {report['duration_seconds']}",
+            f"# TYPE {prefix}_span_seconds gauge"
+        ]
+        lines += [f'{prefix}_span_seconds{{span="{name}"}} {seconds}' for name, seconds in report["spans"].items()]
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        lines += [f'{prefix}_events_total{{event="{name}"}} {value}' for name, value in report["counters"].items()]
+        lines += [
+            f"# TYPE {prefix}_payload_bytes gauge",
+            f"{prefix}_payload_bytes {report['payload_bytes']}"
+        ]
+        if report["peak_rss_bytes"] is not None:
+            lines += [f"# TYPE {prefix}_peak_rss_bytes gauge", f"{prefix}_peak_rss_bytes {report['peak_rss_bytes']}"]
+
+        # Write then rename so the collector never reads a partial file
+        with open(path + ".tmp", "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(path + ".tmp", path)
+
+
+class InstrumentedProvider(MarketDataProvider):
+    """Wraps the provider doing network requests and records each call in RunStats"""
+
+    def __init__(self, provider, stats):
+        self.provider = provider
+        self.stats = stats
+
+    def download(self, tickers, period, interval, start=None):
+        tickers = list(tickers)
+        started = time.perf_counter()
+        try:
+            frames = self.provider.download(tickers, period, interval, start)
+        except Exception:
+            self.stats.count("network_errors")
+            raise
+        self.stats.record_fetch(tickers, period if start is None else f"since {start}", interval,
+                                time.perf_counter() - started, frames)
+        return frames
@@ -0,0 +1,116 @@
+from concurrent.futures import ProcessPoolExecutor
+from services.run_stats import RunStats
+from services.streaming_top_k import Table1Ranker
+from services.defaults import DEFAULT_VOLUME_SOURCE
+
+
+def shard_bounds(size, shards):
+    """Contiguous (start, stop) slices splitting range(size) into at most `shards` even parts"""
+    shards = max(1, min(shards, size))
+    return [(size * i // shards, size * (i + 1) // shards) for i in range(shards)] if size else []
+
+
+# Shard work runs in worker processes: module-level functions so they can be pickled.
+# `build_service(stats)` returns a MarketDataService recording into stats.
+
+def _partial(service, result, stats):
+    return {
+        "result": result,
+        "unavailable": service.unavailable_tickers,
+        "stale": service.stale_tickers,
+        "abandoned": service.deadline_abandoned(),
+        "frames": service.fetched_frames(),
+        "stats": stats.to_dict()
+    }
+
+
+def _table_1_shard(build_service, items, offset):
+    stats = RunStats()
+    service = build_service(stats)
+    return _partial(service, service.compute_table_1_partial(items, offset), stats)
+
+
+def _rows_shard(build_service, table, items):
+    stats = RunStats()
+    service = build_service(stats)
+    compute = service.compute_table_2 if table == "table_2" else service.compute_table_3
+    return _partial(service, compute(items), stats)
+
+
+class ShardedMarketDataService:
+    """Computes the tables over shards of the universe in worker processes.
+
+    Each shard is a contiguous slice of a list, computed by a
+    MarketDataService of its own, which could as well run on another machine.
+    It sends back a partial result: for table 1 the mergeable top-k heaps
+    (Table1Ranker) with rows ranked by their position in the whole list, for
+    tables 2 and 3 its rows, plus its unavailable, stale and deadline-abandoned
+    tickers, the bars it downloaded and run stats. Merging them in shard order
+    gives exactly the single-process result, ties included.
+
+    Quarantine is handled here rather than in the shards so that a single
+    process reads and writes the failure store.
+    """
+
+    def __init__(self, build_service, shards, volume_source=DEFAULT_VOLUME_SOURCE, stats=None, failure_store=None):
+        self.build_service = build_service
+        self.shards = shards
+        self.volume_source = volume_source
+        self.stats = stats or RunStats()
+        self.stats.info["shards"] = shards
+        self.failure_store = failure_store
+        self.unavailable_tickers = []
+        self.quarantined_tickers = []
+        self.stale_tickers = []
+        # Shard processes do not share the rolling volume store: they download the volume history
+        self.volume_stats = None
+        # {(ticker, period, interval): frame} sent back by the shards
+        self._frames = {}
+
+    def fetched_frames(self):
+        """{(ticker, period, interval): frame} of every frame the shards downloaded (None without data)"""
+        return dict(self._frames)
+
+    def _map(self, table, universe, submit):
+        """Run submit(executor, items, offset) per shard and return the partial results in shard order"""
+        if self.failure_store is not None:
+            universe, quarantined = self.failure_store.admit(universe)
+            self.quarantined_tickers.extend(quarantined)
+
+        with self.stats.span(f"{table}.shards"):
+            with ProcessPoolExecutor(max_workers=self.shards) as executor:
+                futures = [
+                    submit(executor, universe[start:stop], start)
+                    for start, stop in shard_bounds(len(universe), self.shards)
+                ]
+                partials = [future.result() for future in futures]
+
+        unavailable = [ticker for partial in partials for ticker in partial["unavailable"]]
+        self.unavailable_tickers.extend(unavailable)
+        for partial in partials:
+            self.stale_tickers.extend(ticker for ticker in partial["stale"] if ticker not in self.stale_tickers)
+            self._frames.update(partial["frames"])
+            self.stats.merge(partial["stats"])
+
+        if self.failure_store is not None:
+            self.failure_store.record_table(universe, unavailable,
+                                            set().union(*(partial["abandoned"] for partial in partials)))
+        return [partial["result"] for partial in partials]
+
+    def compute_table_1(self, universe):
+        ranker = Table1Ranker()
+        for partial in self._map("table_1", universe, lambda executor, items, offset: executor.submit(
+            _table_1_shard, self.build_service, items, offset
+        )):
+            ranker.merge(partial)
+        return ranker.snapshot()
+
+    def compute_table_2(self, universe):
+        return [row for rows in self._map("table_2", universe, lambda executor, items, offset: executor.submit(
+            _rows_shard, self.build_service, "table_2", items
+        )) for row in rows]
+
+    def compute_table_3(self, universe):
+        return [row for rows in self._map("table_3", universe, lambda executor, items, offset: executor.submit(
+            _rows_shard, self.build_service, "table_3", items
+        )) for row in rows]
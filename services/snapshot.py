@@ -0,0 +1,218 @@
+"""Run snapshots: the computed tables and the bars they were computed from.
+
+A snapshot is a folder holding a manifest.json and one .npy file per column,
+so arrays can be memory-mapped on load and a report rebuilt without any
+network access:
+
+    manifest.json                       version, date, info, array index
+    table_1.<category>.<column>.npy     name, variation, multiple, volume_multiple
+    table_<2|3>.<column>.npy            ticker, close, variation, defined
+    bars.<n>.<column>.npy               bars of the n-th (period, interval) group
+
+Bars of a group are stored back to back: tickers[i] owns rows
+offsets[i]:offsets[i + 1] of the ts and OHLCV columns.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from services.market_data_provider import OHLCV_COLUMNS
+
+SNAPSHOT_VERSION = 2
+MANIFEST = "manifest.json"
+
+TABLE_1_CATEGORIES = ("most_active", "best", "worst")
+TABLE_1_NUMBERS = ("variation", "multiple", "volume_multiple")
+
+
+def _strings(values):
+    # Fixed-width unicode arrays can be memory-mapped, object arrays cannot
+    values = [str(value) for value in values]
+    return np.array(values, dtype=f"<U{max((len(value) for value in values), default=1) or 1}")
+
+
+# --------------------------------------------------
+# TABLES
+# --------------------------------------------------
+
+def _table_1_arrays(table1_data):
+    arrays = {}
+    for category in TABLE_1_CATEGORIES:
+        frame = table1_data[category]
+        arrays[f"table_1.{category}.name"] = _strings(frame["name"] if len(frame) else [])
+        for column in TABLE_1_NUMBERS:
+            arrays[f"table_1.{category}.{column}"] = (
+                frame[column].to_numpy(dtype=float) if len(frame) else np.empty(0)
+            )
+    return arrays
+
+
+def _market_table_arrays(table, rows):
+    return {
+        f"{table}.ticker": _strings([row["ticker"] for row in rows]),
+        f"{table}.close": np.array([row["close"] for row in rows], dtype=float),
+        f"{table}.variation": np.array([np.nan if row["variation"] is None else row["variation"] for row in rows], dtype=float),
+        f"{table}.defined": np.array([row["variation"] is not None for row in rows], dtype=bool)
+    }
+
+
+def _table_1_from(arrays):
+    table1_data = {}
+    for category in TABLE_1_CATEGORIES:
+        names = arrays[f"table_1.{category}.name"]
+        if len(names) == 0:
+            table1_data[category] = pd.DataFrame()
+            continue
+        table1_data[category] = pd.DataFrame({
+            "name": names.tolist(),
+            **{column: np.asarray(arrays[f"table_1.{category}.{column}"]) for column in TABLE_1_NUMBERS}
+        })
+    return table1_data
+
+
+def _market_table_from(arrays, table):
+    return [
+        {"ticker": ticker, "close": close, "variation": variation if defined else None}
+        for ticker, close, variation, defined in zip(
+            arrays[f"{table}.ticker"].tolist(),
+            arrays[f"{table}.close"].tolist(),
+            arrays[f"{table}.variation"].tolist(),
+            arrays[f"{table}.defined"].tolist()
+        )
+    ]
+
+
+# --------------------------------------------------
+# BARS
+# --------------------------------------------------
+
+def _bars_arrays(prefix, frames):
+    """Pack {ticker: frame} into offset-indexed columns"""
+    tickers = sorted(frames)
+    lengths = [len(frames[ticker]) for ticker in tickers]
+    offsets = np.zeros(len(tickers) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(lengths)
+
+    stamps, zones, values = [], [], []
+    for ticker in tickers:
+        frame = frames[ticker]
+        index = pd.DatetimeIndex(frame.index)
+        zones.append(str(index.tz) if index.tz is not None else "")
+        stamps.append((index.tz_convert("UTC") if index.tz is not None else index).as_unit("ns").asi8)
+        values.append(frame.reindex(columns=OHLCV_COLUMNS).to_numpy(dtype=float))
+
+    values = np.concatenate(values) if values else np.empty((0, len(OHLCV_COLUMNS)))
+    arrays = {
+        f"{prefix}.ticker": _strings(tickers),
+        f"{prefix}.tz": _strings(zones),
+        f"{prefix}.offsets": offsets,
+        f"{prefix}.ts": np.concatenate(stamps) if stamps else np.empty(0, dtype=np.int64)
+    }
+    for i, column in enumerate(OHLCV_COLUMNS):
+        arrays[f"{prefix}.{column.lower()}"] = np.ascontiguousarray(values[:, i])
+    return arrays
+
+
+def _bars_from(arrays, prefix):
+    tickers = arrays[f"{prefix}.ticker"].tolist()
+    zones = arrays[f"{prefix}.tz"].tolist()
+    offsets = arrays[f"{prefix}.offsets"]
+
+    frames = {}
+    for i, ticker in enumerate(tickers):
+        rows = slice(int(offsets[i]), int(offsets[i + 1]))
+        index = pd.DatetimeIndex(pd.to_datetime(np.asarray(arrays[f"{prefix}.ts"][rows]), unit="ns"))
+        if zones[i]:
+            index = index.tz_localize("UTC").tz_convert(zones[i])
+        frames[ticker] = pd.DataFrame(
+            {column: np.asarray(arrays[f"{prefix}.{column.lower()}"][rows]) for column in OHLCV_COLUMNS},
+            index=index
+        )
+    return frames
+
+
+# --------------------------------------------------
+# SAVE / LOAD
+# --------------------------------------------------
+
+def save_snapshot(path, date, tables, frames=None, info=None):
+    """Write the tables of `date` and the bars behind them to the folder `path`.
+
+    `frames` maps (ticker, period, interval) to the frame the service used.
+    The folder is written next to its final place then swapped in, so an
+    interrupted run never leaves a half-written snapshot behind.
+    """
+    table1_data, table2_data, table3_data = tables
+    arrays = {**_table_1_arrays(table1_data),
+              **_market_table_arrays("table_2", table2_data),
+              **_market_table_arrays("table_3", table3_data)}
+
+    groups = {}
+    for (ticker, period, interval), frame in (frames or {}).items():
+        if frame is not None and len(frame) > 0:
+            groups.setdefault((period, interval), {})[ticker] = frame
+    bars = []
+    for n, ((period, interval), group) in enumerate(sorted(groups.items())):
+        arrays.update(_bars_arrays(f"bars.{n}", group))
+        bars.append({"period": period, "interval": interval, "prefix": f"bars.{n}", "tickers": len(group)})
+
+    folder = path + ".tmp"
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    for name, values in arrays.items():
+        np.save(os.path.join(folder, f"{name}.npy"), values, allow_pickle=False)
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "date": date.strftime("%Y-%m-%d"),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "info": info or {},
+        "bars": bars,
+        "arrays": {name: {"dtype": values.dtype.str, "shape": list(values.shape)} for name, values in arrays.items()}
+    }
+    with open(os.path.join(folder, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(folder, path)
+    return path
+
+
+class Snapshot:
+    """A loaded snapshot; arrays are memory-mapped and only read when used"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{path}: unsupported snapshot version {self.manifest.get('version')}")
+        self.date = datetime.strptime(self.manifest["date"], "%Y-%m-%d")
+        self.info = self.manifest["info"]
+        self.arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+            for name in self.manifest["arrays"]
+        }
+
+    def tables(self):
+        return (
+            _table_1_from(self.arrays),
+            _market_table_from(self.arrays, "table_2"),
+            _market_table_from(self.arrays, "table_3")
+        )
+
+    def frames(self):
+        """{(ticker, period, interval): frame} of the bars the tables were computed from"""
+        frames = {}
+        for group in self.manifest["bars"]:
+            for ticker, frame in _bars_from(self.arrays, group["prefix"]).items():
+                frames[(ticker, group["period"], group["interval"])] = frame
+        return frames
+
+
+def load_snapshot(path):
+    """Return (date, tables, info) of a snapshot folder"""
+    snapshot = Snapshot(path)
+    return snapshot.date, snapshot.tables(), snapshot.info
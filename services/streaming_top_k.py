@@ -0,0 +1,86 @@
+import heapq
+import math
+import pandas as pd
+
+TABLE_1_COLUMNS = ["name", "variation", "multiple", "volume_multiple"]
+
+
+class StreamingTopK:
+    """The k largest (or smallest) values of a stream, in O(k) memory.
+
+    Items are pushed with their position in the universe. The result is
+    ordered like DataFrame.nlargest/nsmallest with keep="first" over the
+    whole universe, whatever the arrival order: ties go to the lowest
+    position and NaN values are skipped.
+    """
+
+    def __init__(self, k, largest=True):
+        self.k = k
+        self.largest = largest
+        # Min-heap of (key, -position, row): the root is the first entry to evict
+        self._heap = []
+
+    def push(self, position, value, row):
+        if value is None or math.isnan(value):
+            return
+        self._push_entry((value if self.largest else -value, -position, row))
+
+    def _push_entry(self, entry):
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def merge(self, other):
+        """Add the items kept by another StreamingTopK over a disjoint part of the universe"""
+        for entry in other._heap:
+            self._push_entry(entry)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def items(self):
+        """(position, row) pairs, best first"""
+        return [(-entry[1], entry[2]) for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+class Table1Ranker:
+    """Most active, best and worst rows of table 1, ranked while tickers stream in"""
+
+    def __init__(self, k=5):
+        self.most_active = StreamingTopK(k)
+        self.best = StreamingTopK(k)
+        self.worst = StreamingTopK(k, largest=False)
+        self.count = 0
+
+    def push(self, position, name, variation, multiple, volume_multiple):
+        row = (name, variation, multiple, volume_multiple)
+        self.most_active.push(position, volume_multiple, row)
+        self.best.push(position, variation, row)
+        self.worst.push(position, variation, row)
+        self.count += 1
+
+    def merge(self, other):
+        """Fold in the rankings of another part of the universe (positions must be global)"""
+        self.most_active.merge(other.most_active)
+        self.best.merge(other.best)
+        self.worst.merge(other.worst)
+        self.count += other.count
+
+    def _frame(self, ranking):
+        items = ranking.items()
+        return pd.DataFrame(
+            [row for _, row in items],
+            index=[position for position, _ in items],
+            columns=TABLE_1_COLUMNS
+        )
+
+    def snapshot(self):
+        """Current rankings in the compute_table_1 format"""
+        if self.count == 0:
+            return {"most_active": pd.DataFrame(), "best": pd.DataFrame(), "worst": pd.DataFrame()}
+        return {
+            "most_active": self._frame(self.most_active),
+            "best": self._frame(self.best),
+            "worst": self._frame(self.worst)
+        }
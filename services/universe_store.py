@@ -0,0 +1,107 @@
+import csv
+import numpy as np
+
+UNIVERSE_COLUMNS = ["ticker", "name", "list"]
+
+
+def exchange_of(ticker):
+    """Exchange suffix of a Yahoo ticker ("PA" for "AI.PA"), "" for indices, FX and futures"""
+    head, dot, suffix = ticker.rpartition(".")
+    return suffix if dot and head else ""
+
+
+def _read_columns(path):
+    """{column: list of str} of a CSV or Parquet file"""
+    if path.endswith(".parquet"):
+        import pandas as pd
+        table = pd.read_parquet(path).fillna("").astype(str)
+        return {column: table[column].tolist() for column in table.columns}
+
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = [row for row in reader if row]
+    return {column: [row[i] for row in rows] for i, column in enumerate(header)}
+
+
+def read_records(path):
+    """Rows of a (ticker, name) CSV or Parquet file in the {"Ticker", "Name"} form, in file order"""
+    columns = _read_columns(path)
+    return [{"Ticker": ticker, "Name": name} for ticker, name in zip(columns["ticker"], columns["name"])]
+
+
+class UniverseStore:
+    """Ticker universe held as parallel numpy columns.
+
+    One row per (list, ticker): a ticker may belong to several lists and
+    each list keeps the order of its rows, which is the order of the report.
+    Duplicated rows within a list and excluded tickers are dropped when the
+    store is built, so selections never need to check them again.
+    """
+
+    def __init__(self, tickers, names, lists, excluded=()):
+        tickers = np.asarray(tickers, dtype=object)
+        names = np.asarray(names, dtype=object)
+        lists = np.asarray(lists, dtype=object)
+
+        self.excluded = frozenset(excluded)
+        seen = set()
+        keep = np.zeros(len(tickers), dtype=bool)
+        for i, key in enumerate(zip(lists, tickers)):
+            if key[1] not in self.excluded and key not in seen:
+                seen.add(key)
+                keep[i] = True
+
+        self.tickers = tickers[keep]
+        self.names = names[keep]
+        self.lists = lists[keep]
+        self.exchanges = np.array([exchange_of(ticker) for ticker in self.tickers], dtype=object)
+
+    @classmethod
+    def from_file(cls, path, excluded_path=None):
+        """Load a CSV or Parquet file with UNIVERSE_COLUMNS, minus the tickers of `excluded_path`"""
+        columns = _read_columns(path)
+        missing = set(UNIVERSE_COLUMNS) - set(columns)
+        if missing:
+            raise ValueError(f"{path}: missing columns {sorted(missing)}")
+        excluded = _read_columns(excluded_path)["ticker"] if excluded_path else ()
+        return cls(columns["ticker"], columns["name"], columns["list"], excluded)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def _subset(self, mask):
+        store = UniverseStore.__new__(UniverseStore)
+        store.excluded = self.excluded
+        store.tickers = self.tickers[mask]
+        store.names = self.names[mask]
+        store.lists = self.lists[mask]
+        store.exchanges = self.exchanges[mask]
+        return store
+
+    # --------------------------------------------------
+    # SELECTION
+    # --------------------------------------------------
+
+    def select(self, lists=None, exchanges=None):
+        """Rows of the given lists and/or exchange suffixes, in store order"""
+        mask = np.ones(len(self), dtype=bool)
+        if lists is not None:
+            mask &= np.isin(self.lists, list(lists))
+        if exchanges is not None:
+            mask &= np.isin(self.exchanges, list(exchanges))
+        return self._subset(mask)
+
+    def list_names(self):
+        return list(dict.fromkeys(self.lists))
+
+    def unique_tickers(self):
+        """Every ticker once, for fetching all lists in one pass"""
+        return list(dict.fromkeys(self.tickers))
+
+    def records(self):
+        """Rows in the {"Ticker", "Name"} form used by MarketDataService"""
+        return [
+            {"Ticker": ticker, "Name": name} if name else {"Ticker": ticker}
+            for ticker, name in zip(self.tickers, self.names)
+        ]
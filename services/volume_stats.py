@@ -0,0 +1,234 @@
+import os
+import warnings
+import numpy as np
+from services.defaults import DEFAULT_VOLUME_STATS_PATH, DEFAULT_VOLUME_WINDOWS
+
+STATISTICS = ("mean", "median", "volatility")
+
+NO_DATE = np.datetime64("NaT", "D")
+
+
+class VolumeStatsStore:
+    """Rolling statistics of the daily volumes of every ticker, kept across runs.
+
+    Each ticker owns a ring buffer of its last `capacity` (the largest
+    window) complete daily volumes and, per window, a running sum and count
+    of the non-NaN volumes in it. Adding a session is O(1) per window: the
+    volume leaving each window is subtracted, the new one added. Means are
+    read from the sums; median and volatility (standard deviation over
+    mean) are computed from the ring on demand.
+
+    Sessions are only added when they are known to follow the last one:
+    `next_date` is the session that came after `last_date` when the ticker
+    was last seen. A ticker whose next session was missed is stale and must
+    be seeded again from a longer download.
+    """
+
+    def __init__(self, path=DEFAULT_VOLUME_STATS_PATH, windows=DEFAULT_VOLUME_WINDOWS):
+        self.path = path
+        self.windows = tuple(sorted(set(windows)))
+        self.capacity = self.windows[-1]
+        self.rows = {}
+        self.volumes = np.full((0, self.capacity), np.nan)
+        # Slot of the next volume written, number of volumes held
+        self.head = np.zeros(0, dtype=int)
+        self.count = np.zeros(0, dtype=int)
+        self.last_date = np.full(0, NO_DATE)
+        self.next_date = np.full(0, NO_DATE)
+        # Running sum and non-NaN count of every (row, window)
+        self.sums = np.zeros((0, len(self.windows)))
+        self.valid = np.zeros((0, len(self.windows)), dtype=int)
+        self.dirty = False
+        if path and os.path.exists(path):
+            self._load()
+
+    @property
+    def seed_period(self):
+        """yfinance period filling the whole ring, plus the latest session"""
+        return f"{self.capacity + 1}d"
+
+    # --------------------------------------------------
+    # PERSISTENCE
+    # --------------------------------------------------
+
+    def _load(self):
+        with np.load(self.path, allow_pickle=False) as data:
+            tickers = data["tickers"].tolist()
+            volumes, head, count = data["volumes"], data["head"], data["count"]
+            last_date, next_date = data["last_date"], data["next_date"]
+
+        self._add_rows(tickers)
+        # Windows may have changed since the store was saved: keep the latest volumes that fit.
+        # Seeding every row recomputes the sums, so rounding never accumulates across runs.
+        ordered = self._ordered(volumes, head, count)
+        self._seed_rows(np.arange(len(tickers)), ordered[:, -min(self.capacity, ordered.shape[1]):],
+                        np.minimum(count, self.capacity), last_date.astype("datetime64[D]"),
+                        next_date.astype("datetime64[D]"))
+        self.dirty = False
+
+    def save(self):
+        if not self.path:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tickers = sorted(self.rows, key=self.rows.get)
+        with open(self.path + ".tmp", "wb") as f:
+            np.savez(
+                f,
+                tickers=np.array(tickers, dtype=f"<U{max(map(len, tickers), default=1)}"),
+                volumes=self.volumes,
+                head=self.head,
+                count=self.count,
+                last_date=self.last_date,
+                next_date=self.next_date
+            )
+        os.replace(self.path + ".tmp", self.path)
+        self.dirty = False
+
+    # --------------------------------------------------
+    # RING BUFFER
+    # --------------------------------------------------
+
+    def _add_rows(self, tickers):
+        new = [ticker for ticker in dict.fromkeys(tickers) if ticker not in self.rows]
+        if not new:
+            return
+        for ticker in new:
+            self.rows[ticker] = len(self.rows)
+        self.volumes = np.vstack([self.volumes, np.full((len(new), self.capacity), np.nan)])
+        self.head = np.concatenate([self.head, np.zeros(len(new), dtype=int)])
+        self.count = np.concatenate([self.count, np.zeros(len(new), dtype=int)])
+        self.last_date = np.concatenate([self.last_date, np.full(len(new), NO_DATE)])
+        self.next_date = np.concatenate([self.next_date, np.full(len(new), NO_DATE)])
+        self.sums = np.vstack([self.sums, np.zeros((len(new), len(self.windows)))])
+        self.valid = np.vstack([self.valid, np.zeros((len(new), len(self.windows)), dtype=int)])
+
+    def tracks(self, ticker):
+        """Whether the ticker has volumes, i.e. may only need its latest sessions"""
+        row = self.rows.get(ticker)
+        return row is not None and self.count[row] > 0
+
+    def _indices(self, tickers):
+        return np.array([self.rows.get(ticker, -1) for ticker in tickers], dtype=int)
+
+    @staticmethod
+    def _ordered(volumes, head, count):
+        """Ring contents as (rows x capacity) oldest first, NaN-padded on the left"""
+        capacity = volumes.shape[1]
+        slots = (head[:, None] + np.arange(capacity)) % capacity
+        ordered = np.take_along_axis(volumes, slots, axis=1)
+        ordered[np.arange(capacity) < capacity - count[:, None]] = np.nan
+        return ordered
+
+    def _window(self, rows, window):
+        """Last `window` volumes of rows, oldest first, NaN where not filled"""
+        return self._ordered(self.volumes[rows], self.head[rows], self.count[rows])[:, -window:]
+
+    def _seed_rows(self, rows, history, counts, last_date, next_date):
+        """Replace the rings of rows with history (rows x n, oldest first, right-aligned)"""
+        history = history[:, -self.capacity:]
+        width = history.shape[1]
+        self.volumes[rows] = np.nan
+        self.volumes[rows, self.capacity - width:] = history
+        self.head[rows] = 0
+        self.count[rows] = np.minimum(counts, width)
+        self.last_date[rows] = last_date
+        self.next_date[rows] = next_date
+        for j, window in enumerate(self.windows):
+            values = self._window(rows, window)
+            self.sums[rows, j] = np.nansum(values, axis=1)
+            self.valid[rows, j] = (~np.isnan(values)).sum(axis=1)
+        self.dirty = True
+
+    def _append(self, rows, volumes):
+        """Add one session to the rings of rows (each row at most once)"""
+        for j, window in enumerate(self.windows):
+            full = self.count[rows] >= window
+            leaving = self.volumes[rows, (self.head[rows] - window) % self.capacity]
+            leaving = np.where(full, leaving, np.nan)
+            self.sums[rows, j] += np.nan_to_num(volumes) - np.nan_to_num(leaving)
+            self.valid[rows, j] += ~np.isnan(volumes) & 1
+            self.valid[rows, j] -= ~np.isnan(leaving) & 1
+        self.volumes[rows, self.head[rows]] = volumes
+        self.head[rows] = (self.head[rows] + 1) % self.capacity
+        self.count[rows] = np.minimum(self.count[rows] + 1, self.capacity)
+
+    # --------------------------------------------------
+    # UPDATES
+    # --------------------------------------------------
+
+    def observe(self, tickers, previous_dates, previous_volumes, latest_dates):
+        """Add the previous session of each ticker if it is the one expected next.
+
+        `previous_*` describe each ticker's last complete session and
+        `latest_dates` the session after it (today's, possibly still open).
+        Returns a mask of the tickers whose ring ends with the previous
+        session, i.e. whose statistics are up to date; the others are stale.
+        """
+        self._add_rows(tickers)
+        rows = self._indices(tickers)
+        previous = np.asarray(previous_dates).astype("datetime64[D]")
+        latest = np.asarray(latest_dates).astype("datetime64[D]")
+        volumes = np.asarray(previous_volumes, dtype=float)
+
+        current = (self.count[rows] > 0) & (self.last_date[rows] == previous)
+        follows = (self.count[rows] > 0) & ~current & (self.next_date[rows] == previous)
+        if follows.any():
+            self._append(rows[follows], volumes[follows])
+            self.last_date[rows[follows]] = previous[follows]
+        known = current | follows
+        if known.any():
+            self.next_date[rows[known]] = latest[known]
+            self.dirty = True
+        return known
+
+    def seed(self, tickers, dates, volumes, counts):
+        """Reset tickers from a right-aligned daily history (rows x bars, latest session last).
+
+        The latest session is left out: it is today's, possibly still open.
+        """
+        self._add_rows(tickers)
+        rows = self._indices(tickers)
+        dates = np.asarray(dates).astype("datetime64[D]")
+        self._seed_rows(rows, np.asarray(volumes, dtype=float)[:, :-1], np.maximum(np.asarray(counts) - 1, 0),
+                        dates[:, -2], dates[:, -1])
+
+    # --------------------------------------------------
+    # STATISTICS
+    # --------------------------------------------------
+
+    def filled(self, tickers, window):
+        """Sessions held in the window of each ticker"""
+        rows = self._indices(tickers)
+        return np.where(rows >= 0, np.minimum(self.count[rows], window), 0)
+
+    def statistic(self, tickers, name, window):
+        """`name` ("mean", "median" or "volatility") of each ticker over its last `window` sessions, NaN when unknown"""
+        if window not in self.windows:
+            raise ValueError(f"Window {window} is not kept (windows: {self.windows})")
+        if name not in STATISTICS:
+            raise ValueError(f"Unknown statistic: {name}")
+
+        rows = self._indices(tickers)
+        known = rows >= 0
+        result = np.full(len(rows), np.nan)
+        if not known.any():
+            return result
+
+        with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+            # Rows without any volume would warn about empty slices
+            warnings.simplefilter("ignore", RuntimeWarning)
+            if name == "mean":
+                j = self.windows.index(window)
+                values = self.sums[rows[known], j] / self.valid[rows[known], j]
+            else:
+                window_values = self._window(rows[known], window)
+                if name == "median":
+                    values = np.nanmedian(window_values, axis=1)
+                else:
+                    values = np.nanstd(window_values, axis=1, ddof=1) / np.nanmean(window_values, axis=1)
+        result[known] = values
+        return result
+
+    def mean(self, tickers, window):
+        return self.statistic(tickers, "mean", window)
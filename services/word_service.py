@@ -1,3 +1,4 @@
+import re
 from docx import Document
 from docx.shared import RGBColor, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
@@ -9,10 +10,129 @@ COLOR_RED = RGBColor(0xC0, 0x00, 0x00)
 FONT_NAME = "Sitka Display"
 FONT_SIZE = Pt(8)
 
+PLACEHOLDER_PATTERN = re.compile(r"\{\{[^{}]+\}\}")
+
+def apply_style(run, color=None):
+    run.font.name = FONT_NAME
+    run.font.size = FONT_SIZE
+    run.font.bold = False
+    if color:
+        run.font.color.rgb = color
+
+def rewrite_paragraph(paragraph, full_text, start, end, color=None):
+    """Rebuild paragraph as styled runs around the value at full_text[start:end]"""
+    before = full_text[:start]
+    after = full_text[end:]
+
+    # Clear paragraph and set alignment
+    paragraph.clear()
+    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    # Add text before placeholder
+    if before:
+        run_before = paragraph.add_run(before)
+        apply_style(run_before)
+
+    # Add replacement text
+    run_value = paragraph.add_run(full_text[start:end])
+    apply_style(run_value, color)
+
+    # Add text after placeholder
+    if after:
+        run_after = paragraph.add_run(after)
+        apply_style(run_after)
+
+def plan_replacements(index, texts, values):
+    """Work out the final text of every paragraph touched by `values`.
+
+    `index` maps a placeholder to the keys of the paragraphs containing it, in
+    document order, and `texts` maps those keys to the paragraph text.
+    `values` maps each placeholder (or is a list of (placeholder, value)
+    pairs) to its text or to a (text, color) pair. Only the first occurrence
+    of a placeholder is replaced.
+
+    Returns {key: (full_text, start, end, color)} where full_text[start:end]
+    is the last value written to the paragraph: as with successive single
+    replacements, it is the only one that keeps its color.
+    """
+    edits = {}
+    pairs = values.items() if isinstance(values, dict) else values
+
+    for placeholder, value in pairs:
+        text, color = value if isinstance(value, tuple) else (value, None)
+
+        for key in index.get(placeholder, []):
+            full_text = edits[key][0] if key in edits else texts[key]
+            placeholder_pos = full_text.find(placeholder)
+            if placeholder_pos < 0:
+                continue
+
+            full_text = full_text[:placeholder_pos] + text + full_text[placeholder_pos + len(placeholder):]
+            edits[key] = (full_text, placeholder_pos, placeholder_pos + len(text), color)
+            break  # Stop after finding and replacing the first occurrence
+
+    return edits
+
+def date_values(date_str):
+    return {"{{DATE}}": date_str}
+
+def table_1_values(data):
+    # Check if dataframes are empty
+    if data["most_active"].empty or data["best"].empty or data["worst"].empty:
+        print("Warning: Some dataframes are empty, skipping table 1 fill")
+        return {}
+
+    values = {}
+    for i in range(min(5, len(data["most_active"]), len(data["best"]), len(data["worst"]))):
+        # Most Active
+        if i < len(data["most_active"]):
+            values[f"{{{{MOST ACTIVE STOCK {i+1}}}}}"] = data["most_active"].iloc[i]["name"]
+            values[f"{{{{MAS MULTIPLE {i+1}}}}}"] = (
+                f'{data["most_active"].iloc[i]["volume_multiple"]:.2f}x',
+                COLOR_BLUE
+            )
+
+        # Best Performer
+        if i < len(data["best"]):
+            values[f"{{{{BEST PERFORMER {i+1}}}}}"] = data["best"].iloc[i]["name"]
+            values[f"{{{{INCREASE {i+1}}}}}"] = (
+                f'+{data["best"].iloc[i]["variation"]*100:.2f}%',
+                COLOR_GREEN
+            )
+
+        # Worst Performer
+        if i < len(data["worst"]):
+            values[f"{{{{WORST PERFORMER {i+1}}}}}"] = data["worst"].iloc[i]["name"]
+            values[f"{{{{DECREASE {i+1}}}}}"] = (
+                f'{data["worst"].iloc[i]["variation"]*100:.2f}%',
+                COLOR_RED
+            )
+    return values
+
+def market_table_values(data, table_num, start_mvt_index):
+    values = {}
+    for i, row in enumerate(data):
+        # Fill price placeholder: T2_1, T2_2, ... or T3_1, T3_2, ...
+        price_placeholder = f"{{{{T{table_num}_{i+1}}}}}"
+        values[price_placeholder] = f"€ {row['close']:,.2f}".replace(",", " ")
+
+        # Fill variation placeholder: MVT1, MVT2, ... or MVT10, MVT11, ...
+        mvt_index = start_mvt_index + i
+        mvt_placeholder = f"{{{{MVT{mvt_index}}}}}"
+
+        if row["variation"] is None:
+            values[mvt_placeholder] = "-"
+        elif row["variation"] > 0:
+            values[mvt_placeholder] = (f'+{row["variation"]*100:.2f}%', COLOR_GREEN)
+        else:
+            values[mvt_placeholder] = (f'{row["variation"]*100:.2f}%', COLOR_RED)
+    return values
+
 class WordService:
 
     def __init__(self, template_path): 
         self.document = Document(template_path) 
+        self._build_index()
 
     def save(self, path):
         self.document.save(path)
@@ -31,137 +151,57 @@ class WordService:
                         yield p
 
     def _apply_style(self, run, color=None):
-        run.font.name = FONT_NAME
-        run.font.size = FONT_SIZE
-        run.font.bold = False
-        if color:
-            run.font.color.rgb = color
-
-    def _replace_placeholder(self, placeholder, text, color=None):
-        found = False
+        apply_style(run, color)
+
+    def _build_index(self):
+        """Scan the document once: placeholder -> paragraphs containing it, in document order"""
+        # Paragraphs are keyed by their XML element: merged table cells yield
+        # the same paragraph several times
+        self._paragraphs = {}
+        self._index = {}
         for paragraph in self._iter_paragraphs():
-            full_text = "".join(run.text for run in paragraph.runs)
-            if placeholder not in full_text:
+            if paragraph._p in self._paragraphs:
                 continue
+            self._paragraphs[paragraph._p] = paragraph
+            full_text = "".join(run.text for run in paragraph.runs)
+            for placeholder in dict.fromkeys(PLACEHOLDER_PATTERN.findall(full_text)):
+                self._index.setdefault(placeholder, []).append(paragraph._p)
 
-            found = True
-            
-            # Find the position of the placeholder
-            placeholder_pos = full_text.find(placeholder)
-            before = full_text[:placeholder_pos]
-            after = full_text[placeholder_pos + len(placeholder):]
-            
-            # Clear paragraph and set alignment
-            paragraph.clear()
-            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-            # Add text before placeholder
-            if before:
-                run_before = paragraph.add_run(before)
-                self._apply_style(run_before)
-
-            # Add replacement text
-            run_value = paragraph.add_run(text)
-            self._apply_style(run_value, color)
-
-            # Add text after placeholder
-            if after:
-                run_after = paragraph.add_run(after)
-                self._apply_style(run_after)
-            
-            break  # Stop after finding and replacing the first occurrence
+    def placeholders(self):
+        """Placeholders found in the document, in document order"""
+        return list(self._index)
+
+    def render(self, values):
+        """Replace a whole mapping of placeholders in one batch, each paragraph being rebuilt once"""
+        keys = {key for placeholder in values for key in self._index.get(placeholder, [])}
+        texts = {key: "".join(run.text for run in self._paragraphs[key].runs) for key in keys}
+
+        for key, (full_text, start, end, color) in plan_replacements(self._index, texts, values).items():
+            rewrite_paragraph(self._paragraphs[key], full_text, start, end, color)
+
+    def _replace_placeholder(self, placeholder, text, color=None):
+        self.render({placeholder: (text, color)})
 
     # --------------------------------------------------
     # DATE
     # --------------------------------------------------
 
     def replace_date(self, date_str):
-        self._replace_placeholder("{{DATE}}", date_str)
+        self.render(date_values(date_str))
 
     # --------------------------------------------------
     # TABLE 1
     # --------------------------------------------------
 
     def fill_table_1(self, data):
-        # Check if dataframes are empty
-        if data["most_active"].empty or data["best"].empty or data["worst"].empty:
-            print("Warning: Some dataframes are empty, skipping table 1 fill")
-            return
-        
-        for i in range(min(5, len(data["most_active"]), len(data["best"]), len(data["worst"]))):
-            # Most Active
-            if i < len(data["most_active"]):
-                self._replace_placeholder(
-                    f"{{{{MOST ACTIVE STOCK {i+1}}}}}",
-                    data["most_active"].iloc[i]["name"]
-                )
-
-                self._replace_placeholder(
-                    f"{{{{MAS MULTIPLE {i+1}}}}}",
-                    f'{data["most_active"].iloc[i]["volume_multiple"]:.2f}x',
-                    COLOR_BLUE
-                )
-
-            # Best Performer
-            if i < len(data["best"]):
-                self._replace_placeholder(
-                    f"{{{{BEST PERFORMER {i+1}}}}}",
-                    data["best"].iloc[i]["name"]
-                )
-
-                self._replace_placeholder(
-                    f"{{{{INCREASE {i+1}}}}}",
-                    f'+{data["best"].iloc[i]["variation"]*100:.2f}%',
-                    COLOR_GREEN
-                )
-
-            # Worst Performer
-            if i < len(data["worst"]):
-                self._replace_placeholder(
-                    f"{{{{WORST PERFORMER {i+1}}}}}",
-                    data["worst"].iloc[i]["name"]
-                )
-
-                self._replace_placeholder(
-                    f"{{{{DECREASE {i+1}}}}}",
-                    f'{data["worst"].iloc[i]["variation"]*100:.2f}%',
-                    COLOR_RED
-                )
+        self.render(table_1_values(data))
 
     # --------------------------------------------------
     # TABLE 2 & 3
     # --------------------------------------------------
 
     def fill_table_2(self, data):
-        self._fill_market_tables(data, table_num=2, start_mvt_index=1)
+        self.render(market_table_values(data, table_num=2, start_mvt_index=1))
 
     def fill_table_3(self, data):
-        self._fill_market_tables(data, table_num=3, start_mvt_index=10)
-
-    def _fill_market_tables(self, data, table_num, start_mvt_index):
-        for i, row in enumerate(data):
-            # Fill price placeholder: T2_1, T2_2, ... or T3_1, T3_2, ...
-            price_placeholder = f"{{{{T{table_num}_{i+1}}}}}"
-            self._replace_placeholder(
-                price_placeholder,
-                f"€ {row['close']:,.2f}".replace(",", " ")
-            )
-
-            # Fill variation placeholder: MVT1, MVT2, ... or MVT10, MVT11, ...
-            mvt_index = start_mvt_index + i
-            mvt_placeholder = f"{{{{MVT{mvt_index}}}}}"
-            
-            if row["variation"] is None:
-                self._replace_placeholder(mvt_placeholder, "-")
-            elif row["variation"] > 0:
-                self._replace_placeholder(
-                    mvt_placeholder,
-                    f'+{row["variation"]*100:.2f}%',
-                    COLOR_GREEN
-                )
-            else:
-                self._replace_placeholder(
-                    mvt_placeholder,
-                    f'{row["variation"]*100:.2f}%',
-                    COLOR_RED
-                )
\ No newline at end of file
+        self.render(market_table_values(data, table_num=3, start_mvt_index=10))
@@ -0,0 +1,30 @@
+from services.backfill import fetch_history
+from services.market_data_provider import ReplayProvider
+from services.fetch_engine import FetchEngine
+
+TICKERS = ["AAA.PA", "BBB.PA", "CCC.PA"]
+
+
+class FlakyProvider(ReplayProvider):
+    """Replay provider whose first call fails"""
+
+    def __init__(self, frames):
+        super().__init__(frames=frames)
+        self.calls = 0
+
+    def download(self, tickers, period, interval, start=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("connection reset")
+        return super().download(tickers, period, interval, start)
+
+
+def test_fetch_history_retries_a_failed_chunk():
+    provider = FlakyProvider(ReplayProvider.synthetic(TICKERS).frames)
+    engine = FetchEngine(workers=1, rate=0, backoff=0.01)
+
+    frames = fetch_history(provider, engine, TICKERS, start=None, chunk_size=2)
+
+    assert sorted(frames) == TICKERS
+    assert provider.calls == 3
+    assert engine.errors == {}
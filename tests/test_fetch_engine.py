@@ -0,0 +1,31 @@
+import time
+from services.fetch_engine import FetchEngine, TokenBucket
+from services.run_stats import RunStats
+
+
+def test_waiting_for_provider_tokens_does_not_time_out():
+    # One token per ticker: every chunk after the first waits 0.25s, longer than the timeout
+    limiter = TokenBucket(20, capacity=5)
+    calls = []
+
+    def download(chunk):
+        limiter.acquire(len(chunk))
+        calls.append(chunk)
+        return chunk
+
+    stats = RunStats()
+    engine = FetchEngine(workers=4, rate=0, timeout=0.1, retries=1, stats=stats)
+    chunks = [tuple(f"T{i}.{j}" for j in range(5)) for i in range(4)]
+
+    assert engine.map(download, chunks) == chunks
+    assert sorted(calls) == chunks
+    assert stats.counters["timeouts"] == 0
+
+
+def test_slow_response_still_times_out():
+    stats = RunStats()
+    engine = FetchEngine(workers=1, rate=0, timeout=0.05, retries=0, stats=stats)
+
+    assert engine.map(lambda item: time.sleep(0.2) or item, ["A"]) == [None]
+    assert isinstance(engine.errors["A"], TimeoutError)
+    assert stats.counters["timeouts"] == 1
@@ -0,0 +1,83 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from services.http_session import pooled_session, connection_reuse
+from services.run_stats import RunStats
+
+ETAG = '"v1"'
+BODY = b'{"chart": {"result": []}}'
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Keep-alive stand-in answering every path with one ETag-validated body"""
+
+    protocol_version = "HTTP/1.1"
+    paths = []
+
+    def do_GET(self):
+        StandIn.paths.append(self.path)
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    StandIn.paths = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_are_routed_to_the_base_url(stand_in):
+    session = pooled_session(1, base_url=stand_in)
+
+    response = session.get("https://query2.finance.yahoo.com/v8/finance/chart/AI.PA?range=5d&interval=1d")
+
+    assert response.status_code == 200
+    assert StandIn.paths == ["/v8/finance/chart/AI.PA?range=5d&interval=1d"]
+
+
+def test_not_modified_answers_replay_the_kept_body(stand_in):
+    stats = RunStats()
+    session = pooled_session(1, base_url=stand_in, stats=stats)
+    url = "https://query2.finance.yahoo.com/v8/finance/chart/AI.PA"
+
+    responses = [session.get(url) for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert all(r.content == BODY for r in responses)
+    assert responses[-1].json() == {"chart": {"result": []}}
+    assert stats.counters["http_conditional_requests"] == 2
+    assert stats.counters["http_not_modified"] == 2
+
+
+def test_connections_are_reused(stand_in):
+    stats = RunStats()
+    session = pooled_session(1, base_url=stand_in, stats=stats)
+
+    for ticker in ("AI.PA", "OR.PA", "AI.PA", "MC.PA"):
+        session.get(f"https://query2.finance.yahoo.com/v8/finance/chart/{ticker}")
+
+    assert stats.counters["http_requests"] == 4
+    assert stats.counters["http_connections_opened"] == 1
+    assert connection_reuse(stats.counters) == 0.75
+
+
+def test_no_reuse_before_any_request():
+    assert connection_reuse({}) is None
@@ -0,0 +1,47 @@
+import numpy as np
+from services.intraday_volume import IntradayVolumeTracker
+from services.market_data_provider import ReplayProvider
+from services.fetch_engine import FetchEngine
+
+TICKERS = ["AAA.PA", "BBB.PA", "CCC.PA"]
+
+
+class FailingProvider(ReplayProvider):
+    """Replay provider whose first `failures` calls fail"""
+
+    def __init__(self, frames, failures):
+        super().__init__(frames=frames)
+        self.failures = failures
+        self.calls = 0
+
+    def download(self, tickers, period, interval, start=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("connection reset")
+        return super().download(tickers, period, interval, start)
+
+
+def tracker(failures, retries=3):
+    provider = FailingProvider(ReplayProvider.synthetic(TICKERS).frames, failures)
+    engine = FetchEngine(workers=1, rate=0, retries=retries, backoff=0.01)
+    return IntradayVolumeTracker(provider, engine, chunk_size=2), provider
+
+
+def test_failed_chunk_is_retried():
+    flaky, provider = tracker(failures=1)
+    expected, _ = tracker(failures=0)
+
+    volumes = flaky.update(TICKERS)
+
+    assert provider.calls == 3
+    np.testing.assert_array_equal(volumes, expected.update(TICKERS))
+    assert not np.isnan(volumes).any()
+
+
+def test_chunk_failing_every_attempt_is_unknown():
+    failing, _ = tracker(failures=1, retries=0)
+
+    volumes = failing.update(TICKERS)
+
+    assert np.isnan(volumes[:2]).all()
+    assert not np.isnan(volumes[2])
@@ -0,0 +1,19 @@
+import pytest
+from services.market_data_provider import MarketDataProvider, ReplayProvider, trim_to_period
+
+
+def test_provider_without_download_cannot_be_built():
+    class Incomplete(MarketDataProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_replay_provider_omits_tickers_without_bars():
+    provider = ReplayProvider.synthetic(["AAA.PA"])
+
+    frames = provider.download(["AAA.PA", "ZZZ.PA"], "11d", "1d")
+
+    assert list(frames) == ["AAA.PA"]
+    assert len(trim_to_period(frames["AAA.PA"], "2d", "1d")) == 2
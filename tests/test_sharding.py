@@ -0,0 +1,81 @@
+import functools
+import pandas as pd
+import pytest
+from services.market_data_service import MarketDataService
+from services.market_data_provider import ReplayProvider, synthetic_frame
+from services.fetch_engine import FetchEngine
+from services.sharding import ShardedMarketDataService, shard_bounds
+
+END = "2024-06-28"
+
+
+def universe_frames():
+    """Synthetic daily bars of 40 tickers: clones of one series (ties) and tickers without data"""
+    tickers = [f"T{i:02d}.PA" for i in range(40)]
+    frames = {}
+    for ticker in tickers:
+        if ticker.endswith(("3.PA", "7.PA")):
+            # No bar at all
+            continue
+        # Clones of the best variation tie for the top of table 1 across shards
+        source = "T01.PA" if ticker.endswith(("0.PA", "5.PA")) else ticker
+        frames[(ticker, "1d")] = synthetic_frame(source, "1d", 260, END)
+    return [{"Ticker": ticker, "Name": ticker} for ticker in tickers], frames
+
+
+def build_service(frames, stats):
+    return MarketDataService(ReplayProvider(frames=frames), engine=FetchEngine(workers=2, rate=0),
+                             chunk_size=4, stats=stats)
+
+
+@pytest.fixture(scope="module")
+def tables():
+    universe, frames = universe_frames()
+    single = build_service(frames, None)
+    sharded = ShardedMarketDataService(functools.partial(build_service, frames), shards=3)
+    return single, sharded, universe
+
+
+def test_sharded_table_1_equals_single_process(tables):
+    single, sharded, universe = tables
+
+    expected = single.compute_table_1(universe)
+    result = sharded.compute_table_1(universe)
+
+    assert result.keys() == expected.keys()
+    for ranking in expected:
+        pd.testing.assert_frame_equal(result[ranking], expected[ranking])
+    # The tie was broken by universe order
+    assert expected["best"]["variation"].nunique() < len(expected["best"])
+
+
+@pytest.mark.parametrize("table", ["compute_table_2", "compute_table_3"])
+def test_sharded_rows_equal_single_process(tables, table):
+    single, sharded, universe = tables
+
+    assert getattr(sharded, table)(universe) == getattr(single, table)(universe)
+
+
+def test_sharded_unavailable_tickers_equal_single_process(tables):
+    single, sharded, universe = tables
+    for service in (single, sharded):
+        service.unavailable_tickers.clear()
+        service.compute_table_2(universe)
+
+    assert sharded.unavailable_tickers == single.unavailable_tickers
+    assert len(single.unavailable_tickers) == 8
+
+
+def test_sharded_run_keeps_the_downloaded_bars(tables):
+    single, sharded, universe = tables
+    sharded.compute_table_2(universe)
+    single.compute_table_2(universe)
+
+    kept = {key[0] for key, frame in sharded.fetched_frames().items() if frame is not None}
+    assert kept == {key[0] for key, frame in single.fetched_frames().items() if frame is not None}
+
+
+def test_shard_bounds_cover_the_range():
+    assert shard_bounds(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert shard_bounds(2, 5) == [(0, 1), (1, 2)]
+    assert shard_bounds(0, 3) == []